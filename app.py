@@ -120,17 +120,20 @@ def show_live_risk_intelligence():
         col_left, col_right = st.columns(2)
 
         with col_left:
-            st.markdown("**Top 5 Highest Risk Events**")
+            # One markdown block per list instead of one element per line
+            lines = ["**Top 5 Highest Risk Events**"]
             for r in top_risks[:5]:
                 prob = r.get("probability", 0)
                 bar = "\U0001f534" if prob > 70 else ("\U0001f7e0" if prob > 40 else "\U0001f7e2")
-                st.markdown(f"{bar} **{r.get('event_id', 'N/A')}** \u2014 {r.get('name', 'Unknown')}: **{prob:.1f}%**")
+                lines.append(f"{bar} **{r.get('event_id', 'N/A')}** \u2014 {r.get('name', 'Unknown')}: **{prob:.1f}%**")
+            st.markdown("\n\n".join(lines))
 
         with col_right:
-            st.markdown("**Top 5 Rising Risks (7d)**")
+            lines = ["**Top 5 Rising Risks (7d)**"]
             for r in top_risers[:5]:
                 change = r.get("change", 0)
-                st.markdown(f"\U0001f4c8 **{r.get('event_id', 'N/A')}** \u2014 {r.get('name', 'Unknown')}: +{change:.1f}pp")
+                lines.append(f"\U0001f4c8 **{r.get('event_id', 'N/A')}** \u2014 {r.get('name', 'Unknown')}: +{change:.1f}pp")
+            st.markdown("\n\n".join(lines))
 
         # Latest calculation timestamp
         latest = data.get("latest_calculation", {})
@@ -5,6 +5,8 @@ Provides cached access to live probabilities, events, and data source health.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import logging
 import os
@@ -39,6 +41,27 @@ CACHE_TTL = 900  # 15 minutes in seconds
 # Simple in-memory cache
 _cache: Dict[str, Dict[str, Any]] = {}
 
+# Shared HTTP session (connection pooling + keep-alive), created on first use
+_session: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
+    """Get the shared requests session for all backend calls."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        # Retry only on gateway errors; connection failures stay fast so
+        # offline detection is not delayed. Once retries are exhausted the
+        # last response is returned so callers still see its HTTP status.
+        retry = Retry(total=3, connect=0, read=0, backoff_factor=0.2,
+                      status_forcelist=(502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        _session = session
+    return _session
+
 
 def _get_cached(key: str) -> Optional[Any]:
     """Get cached value if not expired."""
@@ -68,7 +91,7 @@ def check_backend_health() -> Dict:
     """
     try:
         start = time.time()
-        resp = requests.get(f"{API_BASE_URL}/health", timeout=10)
+        resp = _get_session().get(f"{API_BASE_URL}/health", timeout=10)
         elapsed_ms = round((time.time() - start) * 1000)
         if resp.status_code == 200:
             data = resp.json()
@@ -105,7 +128,7 @@ def fetch_events(limit: int = 500, skip: int = 0, use_cache: bool = True) -> Opt
             return cached
     
     try:
-        resp = requests.get(
+        resp = _get_session().get(
             f"{API_BASE_URL}/api/v1/events",
             params={'limit': limit, 'skip': skip},
             timeout=API_TIMEOUT
@@ -123,12 +146,43 @@ def fetch_events(limit: int = 500, skip: int = 0, use_cache: bool = True) -> Opt
         return None
 
 
-def fetch_probabilities(limit: int = 0, skip: int = 0, use_cache: bool = True) -> Optional[Dict[str, Dict]]:
+def _parse_probability(p: Dict) -> Dict:
+    """Map a backend probability record to the frontend probability dict."""
+    return {
+        'probability': p.get('probability_pct', 50.0) / 100.0,
+        'probability_pct': p.get('probability_pct', 50.0),
+        'confidence_score': p.get('confidence_score', 0.5),
+        'ci_lower_pct': p.get('ci_lower_pct'),
+        'ci_upper_pct': p.get('ci_upper_pct'),
+        'precision_band': p.get('precision_band', 'UNKNOWN'),
+        'calculation_date': p.get('calculation_date'),
+        'flags': p.get('flags', ''),
+        'data_sources_used': p.get('data_sources_used', 0),
+        'baseline_probability_pct': p.get('baseline_probability_pct'),
+        'log_odds': p.get('log_odds'),
+        'total_adjustment': p.get('total_adjustment'),
+        'change_direction': p.get('change_direction'),
+        'attribution': p.get('attribution'),
+        'explanation': p.get('explanation'),
+        'methodology_tier': p.get('methodology_tier'),
+        'signal': p.get('signal'),
+        'momentum': p.get('momentum'),
+        'trend': p.get('trend'),
+        'is_anomaly': p.get('is_anomaly', False)
+    }
+
+
+def fetch_probabilities(limit: int = 0, skip: int = 0, use_cache: bool = True,
+                        ids: Optional[List[str]] = None) -> Optional[Dict[str, Dict]]:
     """
     Fetch latest calculated probabilities from the backend.
     Uses pagination (max 500 per request) to retrieve all entries.
+    When ids is given, only those events are fetched via the batch endpoint.
     Returns dict mapping event_id -> probability data, or None on error.
     """
+    if ids is not None:
+        return _fetch_probabilities_batch(ids, use_cache=use_cache)
+
     cache_key = "probabilities_all"
     if use_cache:
         cached = _get_cached(cache_key)
@@ -142,7 +196,7 @@ def fetch_probabilities(limit: int = 0, skip: int = 0, use_cache: bool = True) -
     
     try:
         while True:
-            resp = requests.get(
+            resp = _get_session().get(
                 f"{API_BASE_URL}/api/v1/probabilities",
                 params={'limit': PAGE_SIZE, 'skip': current_skip},
                 timeout=90
@@ -162,28 +216,7 @@ def fetch_probabilities(limit: int = 0, skip: int = 0, use_cache: bool = True) -
             for p in prob_list:
                 eid = p.get('event_id')
                 if eid and eid not in prob_dict:  # Keep first (newest) record per event
-                    prob_dict[eid] = {
-                        'probability': p.get('probability_pct', 50.0) / 100.0,
-                        'probability_pct': p.get('probability_pct', 50.0),
-                        'confidence_score': p.get('confidence_score', 0.5),
-                        'ci_lower_pct': p.get('ci_lower_pct'),
-                        'ci_upper_pct': p.get('ci_upper_pct'),
-                        'precision_band': p.get('precision_band', 'UNKNOWN'),
-                        'calculation_date': p.get('calculation_date'),
-                        'flags': p.get('flags', ''),
-                        'data_sources_used': p.get('data_sources_used', 0),
-                        'baseline_probability_pct': p.get('baseline_probability_pct'),
-                        'log_odds': p.get('log_odds'),
-                        'total_adjustment': p.get('total_adjustment'),
-                        'change_direction': p.get('change_direction'),
-                        'attribution': p.get('attribution'),
-                        'explanation': p.get('explanation'),
-                        'methodology_tier': p.get('methodology_tier'),
-                        'signal': p.get('signal'),
-                        'momentum': p.get('momentum'),
-                        'trend': p.get('trend'),
-                        'is_anomaly': p.get('is_anomaly', False)
-                    }
+                    prob_dict[eid] = _parse_probability(p)
             
             current_skip += len(prob_list)
             if total and current_skip >= total:
@@ -206,6 +239,53 @@ def fetch_probabilities(limit: int = 0, skip: int = 0, use_cache: bool = True) -
         return None
 
 
+def _fetch_probabilities_batch(ids: List[str], use_cache: bool = True) -> Optional[Dict[str, Dict]]:
+    """
+    Fetch probabilities for specific event IDs only.
+    Serves from cache where possible and POSTs the remaining IDs to the
+    batch endpoint, falling back to the full paginated fetch if unavailable.
+    """
+    prob_dict = {}
+    missing = []
+    all_cached = _get_cached("probabilities_all") if use_cache else None
+    for eid in ids:
+        cached = None
+        if all_cached is not None:
+            cached = all_cached.get(eid)
+        elif use_cache:
+            cached = _get_cached(f"probability_{eid}")
+        if cached is not None:
+            prob_dict[eid] = cached
+        else:
+            missing.append(eid)
+
+    if not missing:
+        return prob_dict
+
+    try:
+        resp = _get_session().post(
+            f"{API_BASE_URL}/api/v1/probabilities/batch",
+            json={'ids': missing},
+            timeout=API_TIMEOUT
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            prob_list = data if isinstance(data, list) else data.get('probabilities', data.get('data', []))
+            for p in prob_list:
+                eid = p.get('event_id')
+                if eid and eid not in prob_dict:
+                    prob_dict[eid] = _parse_probability(p)
+                    _set_cached(f"probability_{eid}", prob_dict[eid])
+        else:
+            logger.warning(f"Batch probability fetch failed: HTTP {resp.status_code}, falling back to full fetch")
+            all_probs = fetch_probabilities(use_cache=use_cache) or {}
+            prob_dict.update({eid: all_probs[eid] for eid in missing if eid in all_probs})
+    except Exception as e:
+        logger.error(f"Error fetching probability batch: {e}")
+
+    return prob_dict or None
+
+
 def fetch_data_sources(use_cache: bool = True) -> Optional[List[Dict]]:
     cache_key = "data_sources"
     if use_cache:
@@ -213,7 +293,7 @@ def fetch_data_sources(use_cache: bool = True) -> Optional[List[Dict]]:
         if cached is not None:
             return cached
     try:
-        resp = requests.get(f"{API_BASE_URL}/api/v1/data-sources/health", timeout=API_TIMEOUT)
+        resp = _get_session().get(f"{API_BASE_URL}/api/v1/data-sources/health", timeout=API_TIMEOUT)
         if resp.status_code == 200:
             data = resp.json()
             sources = data if isinstance(data, list) else data.get('data_sources', data.get('sources', data.get('data', [])))
@@ -227,7 +307,7 @@ def fetch_data_sources(use_cache: bool = True) -> Optional[List[Dict]]:
 
 def trigger_data_refresh(recalculate: bool = True, limit: int = 1000) -> Optional[Dict]:
     try:
-        resp = requests.post(f"{API_BASE_URL}/api/v1/data/refresh", params={'recalculate': recalculate, 'limit': limit}, timeout=120)
+        resp = _get_session().post(f"{API_BASE_URL}/api/v1/data/refresh", params={'recalculate': recalculate, 'limit': limit}, timeout=120)
         if resp.status_code == 200:
             clear_cache()
             return resp.json()
@@ -238,7 +318,7 @@ def trigger_data_refresh(recalculate: bool = True, limit: int = 1000) -> Optiona
 
 def trigger_recalculation(limit: int = 1000) -> Optional[Dict]:
     try:
-        resp = requests.post(f"{API_BASE_URL}/api/v1/calculations/trigger-full", params={'limit': limit}, timeout=90)
+        resp = _get_session().post(f"{API_BASE_URL}/api/v1/calculations/trigger-full", params={'limit': limit}, timeout=90)
         if resp.status_code == 200:
             clear_cache()
             return resp.json()
@@ -264,13 +344,13 @@ def _api_request(method: str, path: str, json_data: dict = None,
     t = timeout or API_TIMEOUT
     try:
         if method == "GET":
-            resp = requests.get(url, params=params, timeout=t)
+            resp = _get_session().get(url, params=params, timeout=t)
         elif method == "POST":
-            resp = requests.post(url, json=json_data, params=params, timeout=t)
+            resp = _get_session().post(url, json=json_data, params=params, timeout=t)
         elif method == "PUT":
-            resp = requests.put(url, json=json_data, params=params, timeout=t)
+            resp = _get_session().put(url, json=json_data, params=params, timeout=t)
         elif method == "DELETE":
-            resp = requests.delete(url, params=params, timeout=t)
+            resp = _get_session().delete(url, params=params, timeout=t)
         else:
             return None
         if resp.status_code in (200, 201):
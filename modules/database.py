@@ -9,6 +9,7 @@ import sqlite3
 import json
 import os
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -33,21 +34,25 @@ try:
 except ImportError:
     API_CLIENT_AVAILABLE = False
 
-# Track backend availability (checked once per session, refreshed on demand)
+# Track backend availability (re-checked after BACKEND_STATUS_TTL, refreshed on demand)
+BACKEND_STATUS_TTL = 60  # seconds
 _backend_online = None
+_backend_checked_at = 0.0
 
 
 def is_backend_online() -> bool:
-    """Check if the backend API is available. Caches result for the session."""
-    global _backend_online
+    """Check if the backend API is available. Caches result for BACKEND_STATUS_TTL seconds."""
+    global _backend_online, _backend_checked_at
     if not API_CLIENT_AVAILABLE:
         return False
-    if _backend_online is None:
+    now = time.monotonic()
+    if _backend_online is None or now - _backend_checked_at >= BACKEND_STATUS_TTL:
         try:
             health = check_backend_health()
             _backend_online = health.get('status') == 'healthy'
         except Exception:
             _backend_online = False
+        _backend_checked_at = now
     return _backend_online
 
 
@@ -63,6 +68,22 @@ def get_data_source():
     return 'backend' if is_backend_online() else 'local'
 
 
+# Bumped by every client/process/risk/assessment write (all of them go through
+# the local SQLite helpers), so pages can tell when their cached reads are stale
+_data_version = 0
+
+
+def get_data_version():
+    """Return a counter that changes whenever client data is written."""
+    return _data_version
+
+
+def _bump_data_version():
+    """Mark client data as changed."""
+    global _data_version
+    _data_version += 1
+
+
 def get_connection():
     """Get a database connection."""
     conn = sqlite3.connect(str(DB_PATH))
@@ -210,6 +231,7 @@ def _create_client_local(name, location="", industry="", revenue=0, employees=0,
     client_id = cursor.lastrowid
     conn.commit()
     conn.close()
+    _bump_data_version()
     return client_id
 
 
@@ -278,6 +300,7 @@ def _update_client_local(client_id, **kwargs):
     cursor.execute(query, values)
     conn.commit()
     conn.close()
+    _bump_data_version()
     return True
 
 
@@ -301,6 +324,7 @@ def _delete_client_local(client_id):
     cursor.execute('DELETE FROM clients WHERE id = ?', (client_id,))
     conn.commit()
     conn.close()
+    _bump_data_version()
     return True
 
 
@@ -339,6 +363,7 @@ def _add_process_local(client_id, process_id, process_name, custom_name="",
     process_db_id = cursor.lastrowid
     conn.commit()
     conn.close()
+    _bump_data_version()
     return process_db_id
 
 
@@ -393,6 +418,7 @@ def _update_process_local(process_db_id, **kwargs):
     cursor.execute(query, values)
     conn.commit()
     conn.close()
+    _bump_data_version()
     return True
 
 
@@ -416,6 +442,7 @@ def _delete_process_local(process_db_id):
     cursor.execute('DELETE FROM client_processes WHERE id = ?', (process_db_id,))
     conn.commit()
     conn.close()
+    _bump_data_version()
     return True
 
 
@@ -456,9 +483,68 @@ def _add_risk_local(client_id, risk_id, risk_name, domain="", category="",
     risk_db_id = cursor.lastrowid
     conn.commit()
     conn.close()
+    _bump_data_version()
     return risk_db_id
 
 
+def add_client_risks_bulk(client_id, risks):
+    """Add or refresh many risks in a client's portfolio. Tries backend API first.
+
+    `risks` is a list of dicts with the add_client_risk fields (risk_id,
+    risk_name, domain, category, probability, is_prioritized, notes).
+    Local writes go through a single transaction.
+    """
+    if not risks:
+        return 0
+    if is_backend_online():
+        try:
+            if all(api_add_risk(client_id, r['risk_id'], r['risk_name'],
+                                r.get('domain', ""), r.get('category', ""),
+                                r.get('probability', 0.5),
+                                bool(r.get('is_prioritized', 0)),
+                                r.get('notes', "")) is not None
+                   for r in risks):
+                _add_risks_local_bulk(client_id, risks)
+                return len(risks)
+        except Exception as e:
+            logger.warning(f"Backend bulk add_risk failed, using local: {e}")
+    return _add_risks_local_bulk(client_id, risks)
+
+
+def _add_risks_local_bulk(client_id, risks):
+    """Upsert many risks in local SQLite, keeping existing row ids."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT risk_id, id FROM client_risks WHERE client_id = ?', (client_id,))
+    existing = {row['risk_id']: row['id'] for row in cursor.fetchall()}
+
+    updates, inserts = [], []
+    for r in risks:
+        values = (r['risk_name'], r.get('domain', ""), r.get('category', ""),
+                  r.get('probability', 0.5), int(r.get('is_prioritized', 0)),
+                  r.get('notes', ""))
+        if r['risk_id'] in existing:
+            updates.append(values + (existing[r['risk_id']],))
+        else:
+            inserts.append((client_id, r['risk_id']) + values)
+
+    cursor.executemany('''
+        UPDATE client_risks
+        SET risk_name = ?, domain = ?, category = ?, probability = ?,
+            is_prioritized = ?, notes = ?
+        WHERE id = ?
+    ''', updates)
+    cursor.executemany('''
+        INSERT INTO client_risks
+        (client_id, risk_id, risk_name, domain, category, probability, is_prioritized, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', inserts)
+    conn.commit()
+    conn.close()
+    _bump_data_version()
+    return len(risks)
+
+
 def get_client_risks(client_id, prioritized_only=False):
     """Get all risks for a client. Tries backend API first."""
     if is_backend_online():
@@ -487,6 +573,29 @@ def get_client_risks(client_id, prioritized_only=False):
     return risks
 
 
+def get_client_risk_ids(client_id, prioritized_only=True):
+    """Get the set of risk IDs in a client's portfolio. Tries backend API first."""
+    if is_backend_online():
+        try:
+            result = api_get_risks(client_id, prioritized_only)
+            if result is not None:
+                return {r['risk_id'] for r in result}
+        except Exception as e:
+            logger.warning(f"Backend get_risks failed, using local: {e}")
+    conn = get_connection()
+    cursor = conn.cursor()
+    if prioritized_only:
+        cursor.execute(
+            'SELECT risk_id FROM client_risks WHERE client_id = ? AND is_prioritized = 1',
+            (client_id,)
+        )
+    else:
+        cursor.execute('SELECT risk_id FROM client_risks WHERE client_id = ?', (client_id,))
+    risk_ids = {row[0] for row in cursor.fetchall()}
+    conn.close()
+    return risk_ids
+
+
 def update_client_risk(risk_db_id, **kwargs):
     """Update a client risk. Tries backend API first."""
     client_id = kwargs.pop('client_id', None)
@@ -516,6 +625,47 @@ def _update_risk_local(risk_db_id, **kwargs):
     cursor.execute(query, values)
     conn.commit()
     conn.close()
+    _bump_data_version()
+    return True
+
+
+def update_client_risks_bulk(client_id, updates):
+    """Update many client risks at once. Tries backend API first.
+
+    `updates` is a list of dicts, each holding the risk's database `id` plus
+    the fields to change. Local writes go through a single transaction.
+    """
+    if not updates:
+        return True
+    if is_backend_online() and client_id:
+        try:
+            if all(api_update_risk(client_id, u['id'],
+                                   **{k: v for k, v in u.items() if k != 'id'})
+                   for u in updates):
+                _update_risks_local_bulk(updates)
+                return True
+        except Exception as e:
+            logger.warning(f"Backend bulk update_risk failed, using local: {e}")
+    return _update_risks_local_bulk(updates)
+
+
+def _update_risks_local_bulk(updates):
+    """Update many risks in local SQLite with one executemany per field set."""
+    by_fields = {}
+    for u in updates:
+        fields = tuple(k for k in u if k not in ('id', 'client_id', 'created_at'))
+        if fields:
+            by_fields.setdefault(fields, []).append(
+                [u[k] for k in fields] + [u['id']]
+            )
+    conn = get_connection()
+    cursor = conn.cursor()
+    for fields, rows in by_fields.items():
+        query = f"UPDATE client_risks SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?"
+        cursor.executemany(query, rows)
+    conn.commit()
+    conn.close()
+    _bump_data_version()
     return True
 
 
@@ -557,6 +707,7 @@ def _save_assessment_local(client_id, process_id, risk_id, vulnerability,
           expected_downtime, notes, datetime.now().isoformat()))
     conn.commit()
     conn.close()
+    _bump_data_version()
     return True
 
 
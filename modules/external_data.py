@@ -14,7 +14,10 @@ Fallback: All sources gracefully fall back to simulated data if APIs fail.
 
 import json
 import random
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from pathlib import Path
@@ -22,6 +25,7 @@ from pathlib import Path
 # Database imports
 import sqlite3
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # Get database path
 APP_DIR = Path(__file__).parent.parent
@@ -50,6 +54,45 @@ API_CONFIG = {
 # Request timeout for API calls (seconds)
 API_TIMEOUT = 10
 
+# Worker threads used to fetch the external sources concurrently
+FETCH_WORKERS = 8
+
+# Retry policy for upstream data fetches (key validation does not retry)
+UPSTREAM_ATTEMPTS = 3
+UPSTREAM_BACKOFF = 1.0  # seconds, doubled after each failed attempt
+UPSTREAM_BACKOFF_MAX = 30
+UPSTREAM_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Circuit breaker: after this many consecutive failed fetches a provider is skipped
+# (callers fall back to simulated data) until the cooldown has passed
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60  # seconds
+
+_BREAKERS = {service: {'failures': 0, 'open_until': 0.0} for service in API_CONFIG}
+_breaker_lock = threading.Lock()
+
+# Default for optional API key arguments: distinguishes "not passed" (look the
+# key up) from an explicit None/empty key (already looked up, not configured)
+_UNSET = object()
+
+
+# Shared HTTP session for upstream APIs (connection pooling + keep-alive), created on first use
+_session: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
+    """Get the shared requests session for all upstream API calls."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        # Retries are handled by _get_with_retry so key validation can stay single-shot
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        _session = session
+    return _session
+
 
 @contextmanager
 def get_db_connection():
@@ -224,7 +267,7 @@ def validate_api_key(service_name: str, api_key: str) -> Dict:
             # Test OpenWeatherMap API
             url = f"{API_CONFIG['openweathermap']['base_url']}/weather"
             params = {'q': 'London', 'appid': api_key}
-            response = requests.get(url, params=params, timeout=API_TIMEOUT)
+            response = _get_session().get(url, params=params, timeout=API_TIMEOUT)
             if response.status_code == 200:
                 result['valid'] = True
                 result['message'] = 'API key is valid'
@@ -237,7 +280,7 @@ def validate_api_key(service_name: str, api_key: str) -> Dict:
             # Test NewsAPI
             url = f"{API_CONFIG['newsapi']['base_url']}/top-headlines"
             params = {'country': 'us', 'pageSize': 1, 'apiKey': api_key}
-            response = requests.get(url, params=params, timeout=API_TIMEOUT)
+            response = _get_session().get(url, params=params, timeout=API_TIMEOUT)
             if response.status_code == 200:
                 result['valid'] = True
                 result['message'] = 'API key is valid'
@@ -274,6 +317,10 @@ def validate_api_key(service_name: str, api_key: str) -> Dict:
     return result
 
 
+# Services that need a key; worldbank is free and always available
+_KEYED_SERVICES = ('openweathermap', 'newsapi')
+
+
 def get_api_status() -> Dict:
     """Get status of all configured APIs."""
     status = {
@@ -282,26 +329,38 @@ def get_api_status() -> Dict:
         'worldbank': {'configured': True, 'status': 'available', 'source': 'free'}
     }
 
-    for service in ['openweathermap', 'newsapi']:
-        # Check Streamlit secrets first
+    # Read the secrets table once rather than once per service
+    secret_keys = {}
+    try:
+        import streamlit as st
+        if hasattr(st, 'secrets') and 'api_keys' in st.secrets:
+            secret_keys = st.secrets['api_keys']
+    except Exception:
+        pass
+
+    pending = []
+    for service in _KEYED_SERVICES:
+        if secret_keys.get(service):
+            status[service].update(configured=True, status='configured', source='streamlit_secrets')
+        else:
+            pending.append(service)
+
+    # One lookup for every service not covered by secrets
+    if pending:
         try:
-            import streamlit as st
-            if hasattr(st, 'secrets') and 'api_keys' in st.secrets:
-                if st.secrets['api_keys'].get(service):
-                    status[service]['configured'] = True
-                    status[service]['status'] = 'configured'
-                    status[service]['source'] = 'streamlit_secrets'
-                    continue
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT service_name FROM api_keys WHERE is_valid = 1 "
+                    "AND api_key IS NOT NULL AND api_key != '' "
+                    f"AND service_name IN ({','.join('?' * len(pending))})",
+                    pending
+                )
+                for row in cursor.fetchall():
+                    status[row['service_name']].update(configured=True, status='configured', source='database')
         except Exception:
             pass
 
-        # Check database
-        key = get_api_key(service)
-        if key:
-            status[service]['configured'] = True
-            status[service]['status'] = 'configured'
-            status[service]['source'] = 'database'
-
     return status
 
 
@@ -428,13 +487,54 @@ def clear_expired_cache():
 # REAL API FETCHERS (with fallback to simulated)
 # ============================================================================
 
+def _breaker_open(service: str) -> bool:
+    """True while a provider's circuit breaker is open and calls should be skipped."""
+    return time.monotonic() < _BREAKERS[service]['open_until']
+
+
+def _record_upstream_result(service: str, ok: bool):
+    """Reset a provider's breaker on success; open it after repeated failures."""
+    with _breaker_lock:
+        breaker = _BREAKERS[service]
+        if ok:
+            breaker['failures'] = 0
+            breaker['open_until'] = 0.0
+        else:
+            breaker['failures'] += 1
+            if breaker['failures'] >= BREAKER_THRESHOLD:
+                breaker['open_until'] = time.monotonic() + BREAKER_COOLDOWN
+
+
+def _get_with_retry(service: str, url: str, params: Dict) -> requests.Response:
+    """
+    GET an upstream API, retrying transient failures with exponential backoff and jitter.
+    Connection errors, timeouts, 429 and 5xx are retried; any other response
+    (including 401/403 for a bad key) is returned immediately.
+    The outcome feeds the provider's circuit breaker.
+    """
+    for attempt in range(UPSTREAM_ATTEMPTS):
+        last_attempt = attempt == UPSTREAM_ATTEMPTS - 1
+        try:
+            response = _get_session().get(url, params=params, timeout=API_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_attempt:
+                _record_upstream_result(service, False)
+                raise
+        else:
+            if last_attempt or response.status_code not in UPSTREAM_RETRY_STATUS:
+                _record_upstream_result(service, response.status_code not in UPSTREAM_RETRY_STATUS)
+                return response
+        delay = min(UPSTREAM_BACKOFF * 2 ** attempt, UPSTREAM_BACKOFF_MAX)
+        time.sleep(delay + random.uniform(0, 0.5))
+
+
 def fetch_weather_data_real(region: str = "global") -> Optional[Dict]:
     """
     Fetch real weather data from OpenWeatherMap API.
     Returns None if API call fails (will fall back to simulated).
     """
     api_key = get_api_key('openweathermap')
-    if not api_key:
+    if not api_key or _breaker_open('openweathermap'):
         return None
 
     try:
@@ -453,7 +553,7 @@ def fetch_weather_data_real(region: str = "global") -> Optional[Dict]:
         url = f"{API_CONFIG['openweathermap']['base_url']}/weather"
         params = {'q': city, 'appid': api_key, 'units': 'metric'}
 
-        response = requests.get(url, params=params, timeout=API_TIMEOUT)
+        response = _get_with_retry('openweathermap', url, params)
 
         if response.status_code == 200:
             weather_data = response.json()
@@ -500,13 +600,16 @@ def fetch_weather_data_real(region: str = "global") -> Optional[Dict]:
     return None
 
 
-def fetch_news_data_real(risk_category: str, region: str = "global") -> Optional[Dict]:
+def fetch_news_data_real(risk_category: str, region: str = "global",
+                         api_key: Optional[str] = _UNSET) -> Optional[Dict]:
     """
     Fetch real news data from NewsAPI.
     Returns None if API call fails (will fall back to simulated).
+    Pass api_key (even None) to skip the key lookup when fetching several categories.
     """
-    api_key = get_api_key('newsapi')
-    if not api_key:
+    if api_key is _UNSET:
+        api_key = get_api_key('newsapi')
+    if not api_key or _breaker_open('newsapi'):
         return None
 
     try:
@@ -530,7 +633,7 @@ def fetch_news_data_real(risk_category: str, region: str = "global") -> Optional
             'apiKey': api_key
         }
 
-        response = requests.get(url, params=params, timeout=API_TIMEOUT)
+        response = _get_with_retry('newsapi', url, params)
 
         if response.status_code == 200:
             news_data = response.json()
@@ -576,6 +679,9 @@ def fetch_economic_data_real(region: str = "global") -> Optional[Dict]:
     Fetch real economic data from World Bank API (free, no key needed).
     Returns None if API call fails (will fall back to simulated).
     """
+    if _breaker_open('worldbank'):
+        return None
+
     try:
         # Map region to World Bank country code
         region_codes = {
@@ -592,7 +698,7 @@ def fetch_economic_data_real(region: str = "global") -> Optional[Dict]:
         url = f"{API_CONFIG['worldbank']['base_url']}/country/{country_code}/indicator/NY.GDP.MKTP.KD.ZG"
         params = {'format': 'json', 'per_page': 5, 'date': '2020:2024'}
 
-        response = requests.get(url, params=params, timeout=API_TIMEOUT)
+        response = _get_with_retry('worldbank', url, params)
 
         if response.status_code == 200:
             data = response.json()
@@ -784,7 +890,8 @@ def fetch_operational_data(industry: str = "general") -> Dict:
 # MAIN DATA FETCHERS (with automatic fallback)
 # ============================================================================
 
-def fetch_news_data(risk_category: str, region: str = "global") -> Dict:
+def fetch_news_data(risk_category: str, region: str = "global",
+                    api_key: Optional[str] = _UNSET) -> Dict:
     """
     Fetch news/incident data - tries real API first, falls back to simulated.
     """
@@ -794,7 +901,7 @@ def fetch_news_data(risk_category: str, region: str = "global") -> Dict:
         return cached['data']
 
     # Try real API first
-    data = fetch_news_data_real(risk_category, region)
+    data = fetch_news_data_real(risk_category, region, api_key)
 
     # Fall back to simulated if API fails
     if data is None:
@@ -854,23 +961,43 @@ def fetch_all_external_data(client_industry: str = "general",
     """
     Fetch all external data sources for a client.
     Returns aggregated data for probability calculations.
+
+    Sources are fetched concurrently, so a cold fetch takes roughly as long
+    as the slowest API instead of the sum of all of them.
     """
+    # The four news categories run concurrently against NewsAPI; resolve its key once for all of them
+    news_key = get_api_key('newsapi')
+    tasks = {
+        ('news', 'physical'): (fetch_news_data, 'Physical', client_region, news_key),
+        ('news', 'structural'): (fetch_news_data, 'Structural', client_region, news_key),
+        ('news', 'operational'): (fetch_news_data, 'Operational', client_region, news_key),
+        ('news', 'digital'): (fetch_news_data, 'Digital', client_region, news_key),
+        ('weather',): (fetch_weather_data, client_region),
+        ('economic',): (fetch_economic_data, client_region),
+        ('cyber',): (fetch_cyber_threat_data, client_industry),
+        ('operational',): (fetch_operational_data, client_industry),
+        ('api_status',): (get_api_status,),
+    }
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        futures = {key: pool.submit(*task) for key, task in tasks.items()}
+        results = {key: future.result() for key, future in futures.items()}
+
     return {
         'news': {
-            'physical': fetch_news_data('Physical', client_region),
-            'structural': fetch_news_data('Structural', client_region),
-            'operational': fetch_news_data('Operational', client_region),
-            'digital': fetch_news_data('Digital', client_region)
+            'physical': results[('news', 'physical')],
+            'structural': results[('news', 'structural')],
+            'operational': results[('news', 'operational')],
+            'digital': results[('news', 'digital')]
         },
-        'weather': fetch_weather_data(client_region),
-        'economic': fetch_economic_data(client_region),
-        'cyber': fetch_cyber_threat_data(client_industry),
-        'operational': fetch_operational_data(client_industry),
+        'weather': results[('weather',)],
+        'economic': results[('economic',)],
+        'cyber': results[('cyber',)],
+        'operational': results[('operational',)],
         'metadata': {
             'fetched_at': datetime.now().isoformat(),
             'client_industry': client_industry,
             'client_region': client_region,
-            'api_status': get_api_status()
+            'api_status': results[('api_status',)]
         }
     }
 
@@ -957,20 +1084,20 @@ def refresh_all_data(client_industry: str = "general",
         except Exception:
             pass
 
-    # Fetch fresh data
+    # Fetch fresh data (all sources concurrently)
     data = fetch_all_external_data(client_industry, client_region)
 
-    # Update refresh timestamps
+    # Update refresh timestamps in one statement
+    sources = ['news', 'weather', 'economic', 'cyber', 'operational']
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            for source_type in ['weather', 'news', 'economic', 'cyber', 'operational']:
-                cursor.execute('''
-                    UPDATE refresh_schedule
-                    SET last_refresh = datetime('now'),
-                        next_refresh = datetime('now', '+' || refresh_interval_hours || ' hours')
-                    WHERE source_type = ?
-                ''', (source_type,))
+            cursor.execute(f'''
+                UPDATE refresh_schedule
+                SET last_refresh = datetime('now'),
+                    next_refresh = datetime('now', '+' || refresh_interval_hours || ' hours')
+                WHERE source_type IN ({','.join('?' * len(sources))})
+            ''', sources)
             conn.commit()
     except Exception:
         pass
@@ -978,8 +1105,9 @@ def refresh_all_data(client_industry: str = "general",
     return {
         'success': True,
         'refreshed_at': datetime.now().isoformat(),
-        'sources_refreshed': ['news', 'weather', 'economic', 'cyber', 'operational'],
-        'api_status': get_api_status(),
+        'sources_refreshed': sources,
+        # Already probed alongside the source fetches
+        'api_status': data['metadata']['api_status'],
         'data': data
     }
 
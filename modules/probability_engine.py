@@ -18,6 +18,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 # Import external data module
 from modules.external_data import (
     fetch_all_external_data,
@@ -399,25 +401,62 @@ def calculate_risk_probability(risk: Dict, external_data: Dict,
 
 
 def calculate_all_probabilities(risks: List[Dict], client_data: Dict = None,
-                                 force_refresh: bool = False) -> Dict:
+                                 force_refresh: bool = False,
+                                 external_data: Dict = None) -> Dict:
     """
     Calculate probabilities for all risks.
 
+    Pass external_data to reuse an already fetched snapshot.
     Returns a dictionary mapping risk IDs to probability data.
     """
     if client_data is None:
         client_data = {'industry': 'general', 'region': 'global'}
 
     # Fetch external data
-    external_data = fetch_all_external_data(
-        client_industry=client_data.get('industry', 'general'),
-        client_region=client_data.get('region', 'global')
-    )
+    if external_data is None:
+        external_data = fetch_all_external_data(
+            client_industry=client_data.get('industry', 'general'),
+            client_region=client_data.get('region', 'global')
+        )
+
+    # Factor matrix (one row per risk, columns in FACTOR_WEIGHTS order); the
+    # trend score only depends on the domain, so it is computed once per domain
+    risks = list(risks)
+    factors = np.empty((len(risks), len(FACTOR_WEIGHTS)), dtype=np.float64)
+    trend_by_domain = {}
+    for i, risk in enumerate(risks):
+        domain = risk.get('domain', 'OPERATIONAL').upper()
+        if domain not in trend_by_domain:
+            trend_by_domain[domain] = calculate_trend_score(risk, external_data)
+        factors[i] = (
+            calculate_historical_frequency_score(risk, external_data),
+            trend_by_domain[domain],
+            calculate_current_conditions_score(risk, external_data),
+            calculate_exposure_factor(risk, client_data)
+        )
+
+    # Weighted sum in one sweep over the columns (same term order as calculate_risk_probability)
+    weighted = np.zeros(len(risks), dtype=np.float64)
+    for col, weight in enumerate(FACTOR_WEIGHTS.values()):
+        weighted = weighted + factors[:, col] * weight
+
+    data_quality = external_data.get('metadata', {}).get('data_quality', 'simulated')
+    confidence = 0.7 if data_quality == 'simulated' else 0.9
+    calculated_at = datetime.now().isoformat()
+
+    risk_ids = [risk.get('id', risk.get('risk_name', 'unknown')) for risk in risks]
+    # Python's round() (not np.round) so stored values match the per-risk path exactly
+    probabilities = np.array([round(score, 3) for score in weighted.tolist()])
 
     results = {}
-    for risk in risks:
-        risk_id = risk.get('id', risk.get('risk_name', 'unknown'))
-        results[risk_id] = calculate_risk_probability(risk, external_data, client_data)
+    for risk_id, row, prob in zip(risk_ids, factors.tolist(), probabilities.tolist()):
+        results[risk_id] = {
+            'probability': prob,
+            'factors': dict(zip(FACTOR_WEIGHTS, row)),
+            'weights': FACTOR_WEIGHTS,
+            'confidence': confidence,
+            'calculated_at': calculated_at
+        }
 
     return {
         'probabilities': results,
@@ -425,7 +464,11 @@ def calculate_all_probabilities(risks: List[Dict], client_data: Dict = None,
             'fetched_at': external_data.get('metadata', {}).get('fetched_at'),
             'data_quality': external_data.get('metadata', {}).get('data_quality', 'simulated')
         },
-        'total_risks_calculated': len(results)
+        'total_risks_calculated': len(results),
+        # Array view of the same results: row i of factor_matrix / probability_array is risk_ids[i]
+        'risk_ids': risk_ids,
+        'factor_matrix': factors,
+        'probability_array': probabilities
     }
 
 
@@ -433,23 +476,19 @@ def update_risk_probabilities_in_db(client_id: int, probabilities: Dict):
     """
     Update risk probabilities in the database for a client.
     """
+    rows = [
+        (prob_data['probability'], json.dumps(prob_data['factors']), client_id, risk_id)
+        for risk_id, prob_data in probabilities.get('probabilities', {}).items()
+    ]
     with get_db_connection() as conn:
         cursor = conn.cursor()
-
-        for risk_id, prob_data in probabilities.get('probabilities', {}).items():
-            cursor.execute('''
-                UPDATE client_risks
-                SET probability = ?,
-                    probability_factors = ?,
-                    probability_updated = datetime('now')
-                WHERE client_id = ? AND risk_id = ?
-            ''', (
-                prob_data['probability'],
-                json.dumps(prob_data['factors']),
-                client_id,
-                risk_id
-            ))
-
+        cursor.executemany('''
+            UPDATE client_risks
+            SET probability = ?,
+                probability_factors = ?,
+                probability_updated = datetime('now')
+            WHERE client_id = ? AND risk_id = ?
+        ''', rows)
         conn.commit()
 
 
@@ -457,19 +496,31 @@ def get_probability_summary(probabilities: Dict) -> Dict:
     """
     Get summary statistics for calculated probabilities.
     """
-    probs = [p['probability'] for p in probabilities.get('probabilities', {}).values()]
+    return summarize_probabilities(
+        p['probability'] for p in probabilities.get('probabilities', {}).values()
+    )
+
+
+def summarize_probabilities(values) -> Dict:
+    """
+    Summary statistics for an iterable of probability values, computed on one NumPy array.
+    """
+    probs = np.fromiter(values, dtype=np.float64)
 
-    if not probs:
+    if not probs.size:
         return {'error': 'No probabilities calculated'}
 
+    high = int(np.count_nonzero(probs >= 0.7))
+    low = int(np.count_nonzero(probs < 0.3))
     return {
-        'total_risks': len(probs),
-        'average_probability': round(sum(probs) / len(probs), 3),
-        'max_probability': round(max(probs), 3),
-        'min_probability': round(min(probs), 3),
-        'high_risk_count': len([p for p in probs if p >= 0.7]),
-        'medium_risk_count': len([p for p in probs if 0.3 <= p < 0.7]),
-        'low_risk_count': len([p for p in probs if p < 0.3])
+        'total_risks': int(probs.size),
+        # Left-to-right sum keeps averages identical to the previous list-based summary
+        'average_probability': round(sum(probs.tolist()) / probs.size, 3),
+        'max_probability': round(float(probs.max()), 3),
+        'min_probability': round(float(probs.min()), 3),
+        'high_risk_count': high,
+        'medium_risk_count': int(probs.size) - high - low,
+        'low_risk_count': low
     }
 
 
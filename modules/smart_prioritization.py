@@ -18,7 +18,9 @@ import re
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+import numpy as np
 
 # App directory for loading data
 APP_DIR = Path(__file__).parent.parent
@@ -61,6 +63,15 @@ PROCESS_RISK_KEYWORDS = {
     'phishing': ['employee', 'email', 'communication', 'security', 'access'],
 }
 
+# Process keywords that align with each risk domain
+# NOTE: Keys use UPPERCASE to match database values
+DOMAIN_PROCESS_KEYWORDS = {
+    'PHYSICAL': frozenset(('facility', 'warehouse', 'manufacturing', 'logistics', 'operations')),
+    'STRUCTURAL': frozenset(('financial', 'procurement', 'sales', 'legal', 'strategy')),
+    'OPERATIONAL': frozenset(('production', 'service', 'quality', 'human', 'maintenance')),
+    'DIGITAL': frozenset(('it', 'technology', 'data', 'system', 'digital', 'cyber'))
+}
+
 # Industry-specific risk amplifiers
 # NOTE: Domain keys use UPPERCASE to match risk database Layer_1_Primary values
 INDUSTRY_RISK_FACTORS = {
@@ -91,10 +102,50 @@ INDUSTRY_RISK_FACTORS = {
 }
 
 
+# Composite-score priority bands: score >= threshold[i] moves up one level
+PRIORITY_THRESHOLDS = np.array([30, 50, 70])
+PRIORITY_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+PRIORITY_COLORS = {
+    'Critical': '#dc3545',  # Red
+    'High': '#fd7e14',      # Orange
+    'Medium': '#ffc107',    # Yellow
+    'Low': '#28a745'        # Green
+}
+PRIORITY_ICONS = {
+    'Critical': '🔴',
+    'High': '🟠',
+    'Medium': '🟡',
+    'Low': '🟢'
+}
+
+
 # ============================================================================
 # RISK-PROCESS MATCHING ENGINE
 # ============================================================================
 
+def _risk_profile(risk: Dict) -> Dict:
+    """Lowercased text and matched risk keywords for a risk, computed once."""
+    risk_name = risk.get('Event_Name', risk.get('risk_name', '')).lower()
+    risk_desc = risk.get('Event_Description', '').lower()
+    return {
+        # Normalize domain to uppercase to match database values
+        'domain': risk.get('Layer_1_Primary', risk.get('domain', 'OPERATIONAL')).upper(),
+        'keywords': [
+            (risk_keyword, process_keywords)
+            for risk_keyword, process_keywords in PROCESS_RISK_KEYWORDS.items()
+            if risk_keyword in risk_name or risk_keyword in risk_desc
+        ]
+    }
+
+
+def _process_profile(process: Dict) -> Dict:
+    """Lowercased name and category for a process, computed once."""
+    return {
+        'name': process.get('process_name', process.get('Activity_Name', '')).lower(),
+        'category': process.get('category', process.get('Process_Group_Name', '')).lower()
+    }
+
+
 def calculate_risk_process_relevance(risk: Dict, process: Dict,
                                       industry: str = 'general') -> Dict:
     """
@@ -102,14 +153,16 @@ def calculate_risk_process_relevance(risk: Dict, process: Dict,
 
     Returns a relevance score (0-100) and matching reasons.
     """
-    risk_name = risk.get('Event_Name', risk.get('risk_name', '')).lower()
-    risk_desc = risk.get('Event_Description', '').lower()
-    # Normalize domain to uppercase to match database values
-    risk_domain = risk.get('Layer_1_Primary', risk.get('domain', 'OPERATIONAL')).upper()
-    risk_category = risk.get('Layer_2_Primary', risk.get('category', '')).lower()
+    return _score_relevance(risk, process, industry,
+                            _risk_profile(risk), _process_profile(process))
 
-    process_name = process.get('process_name', process.get('Activity_Name', '')).lower()
-    process_category = process.get('category', process.get('Process_Group_Name', '')).lower()
+
+def _score_relevance(risk: Dict, process: Dict, industry: str,
+                     risk_profile: Dict, process_profile: Dict) -> Dict:
+    """Relevance scoring with the risk/process text already normalized."""
+    risk_domain = risk_profile['domain']
+    process_name = process_profile['name']
+    process_category = process_profile['category']
 
     score = 0
     reasons = []
@@ -118,16 +171,14 @@ def calculate_risk_process_relevance(risk: Dict, process: Dict,
     keyword_matches = 0
     matched_keywords = []
 
-    for risk_keyword, process_keywords in PROCESS_RISK_KEYWORDS.items():
-        # Check if risk contains this keyword
-        if risk_keyword in risk_name or risk_keyword in risk_desc:
-            # Check if process matches any associated keywords
-            for proc_kw in process_keywords:
-                if proc_kw in process_name or proc_kw in process_category:
-                    keyword_matches += 1
-                    if risk_keyword not in matched_keywords:
-                        matched_keywords.append(risk_keyword)
-                    break
+    for risk_keyword, process_keywords in risk_profile['keywords']:
+        # Check if process matches any associated keywords
+        for proc_kw in process_keywords:
+            if proc_kw in process_name or proc_kw in process_category:
+                keyword_matches += 1
+                if risk_keyword not in matched_keywords:
+                    matched_keywords.append(risk_keyword)
+                break
 
     keyword_score = min(keyword_matches * 10, 40)
     score += keyword_score
@@ -135,20 +186,11 @@ def calculate_risk_process_relevance(risk: Dict, process: Dict,
         reasons.append(f"Keyword matches: {', '.join(matched_keywords)}")
 
     # 2. Domain-process alignment (0-25 points)
-    # NOTE: Keys use UPPERCASE to match database values
-    domain_alignment = {
-        'PHYSICAL': ['facility', 'warehouse', 'manufacturing', 'logistics', 'operations'],
-        'STRUCTURAL': ['financial', 'procurement', 'sales', 'legal', 'strategy'],
-        'OPERATIONAL': ['production', 'service', 'quality', 'human', 'maintenance'],
-        'DIGITAL': ['it', 'technology', 'data', 'system', 'digital', 'cyber']
-    }
-
-    if risk_domain in domain_alignment:
-        for keyword in domain_alignment[risk_domain]:
-            if keyword in process_name or keyword in process_category:
-                score += 25
-                reasons.append(f"Process aligns with {risk_domain} domain")
-                break
+    for keyword in DOMAIN_PROCESS_KEYWORDS.get(risk_domain, ()):
+        if keyword in process_name or keyword in process_category:
+            score += 25
+            reasons.append(f"Process aligns with {risk_domain} domain")
+            break
 
     # 3. Industry factor (0-20 points)
     industry_lower = industry.lower() if industry else 'general'
@@ -194,9 +236,11 @@ def auto_match_risks_to_process(process: Dict, risks: List[Dict],
     Returns top N risks sorted by relevance.
     """
     matches = []
+    process_profile = _process_profile(process)
 
     for risk in risks:
-        relevance = calculate_risk_process_relevance(risk, process, industry)
+        relevance = _score_relevance(risk, process, industry,
+                                     _risk_profile(risk), process_profile)
         if relevance['relevance_score'] > 0:
             matches.append({
                 **relevance,
@@ -218,9 +262,11 @@ def auto_match_processes_to_risk(risk: Dict, processes: List[Dict],
     Returns top N processes sorted by relevance.
     """
     matches = []
+    risk_profile = _risk_profile(risk)
 
     for process in processes:
-        relevance = calculate_risk_process_relevance(risk, process, industry)
+        relevance = _score_relevance(risk, process, industry,
+                                     risk_profile, _process_profile(process))
         if relevance['relevance_score'] > 0:
             matches.append({
                 **relevance,
@@ -244,13 +290,18 @@ def generate_matching_matrix(processes: List[Dict], risks: List[Dict],
     high_priority_pairs = []
     medium_priority_pairs = []
 
+    # Normalize each risk's text once instead of once per process
+    risk_profiles = [_risk_profile(risk) for risk in risks]
+
     for process in processes:
         proc_id = process.get('id', process.get('process_id', ''))
         matrix[proc_id] = {}
+        process_profile = _process_profile(process)
 
-        for risk in risks:
+        for risk, risk_profile in zip(risks, risk_profiles):
             risk_id = risk.get('Event_ID', risk.get('risk_id', ''))
-            relevance = calculate_risk_process_relevance(risk, process, industry)
+            relevance = _score_relevance(risk, process, industry,
+                                         risk_profile, process_profile)
             matrix[proc_id][risk_id] = relevance
 
             # Track priority pairs
@@ -314,18 +365,8 @@ def calculate_composite_risk_score(assessment: Dict) -> Dict:
     composite_score = prob_score + vuln_score + impact_score + resilience_score
 
     # Determine priority level
-    if composite_score >= 70:
-        priority = 'Critical'
-        priority_color = '#dc3545'  # Red
-    elif composite_score >= 50:
-        priority = 'High'
-        priority_color = '#fd7e14'  # Orange
-    elif composite_score >= 30:
-        priority = 'Medium'
-        priority_color = '#ffc107'  # Yellow
-    else:
-        priority = 'Low'
-        priority_color = '#28a745'  # Green
+    priority = PRIORITY_LEVELS[int(np.digitize(composite_score, PRIORITY_THRESHOLDS))]
+    priority_color = PRIORITY_COLORS[priority]
 
     return {
         'composite_score': round(composite_score, 1),
@@ -351,23 +392,61 @@ def rank_assessments_by_priority(assessments: List[Dict]) -> List[Dict]:
     """
     Rank all assessments by composite risk score.
 
-    Returns assessments sorted by priority with scores.
+    Scores are computed column-wise with NumPy (same formula as
+    calculate_composite_risk_score). Returns assessments sorted by
+    priority with scores.
     """
-    scored_assessments = []
+    n = len(assessments)
+    if n == 0:
+        return []
 
-    for assessment in assessments:
-        score_data = calculate_composite_risk_score(assessment)
-        scored_assessments.append({
-            **assessment,
-            **score_data
-        })
+    def column(key, default):
+        return np.fromiter((a.get(key, default) for a in assessments),
+                           dtype=np.float64, count=n)
 
-    # Sort by composite score descending
-    scored_assessments.sort(key=lambda x: x['composite_score'], reverse=True)
+    probability = column('probability', 0.5)
+    vulnerability = column('vulnerability', 0.5)
+    resilience = column('resilience', 0.3)
+    criticality = column('criticality_per_day', 0)
+    downtime = column('expected_downtime', 5)
 
-    # Add rank
-    for i, assessment in enumerate(scored_assessments, 1):
-        assessment['rank'] = i
+    max_potential_impact = 100000 * 365
+    impact_normalized = np.minimum(criticality * downtime * probability / max_potential_impact, 1.0)
+
+    prob_score = probability * 25
+    vuln_score = vulnerability * 25
+    impact_score = impact_normalized * 25
+    resilience_score = (1 - resilience) * 25
+    composite = prob_score + vuln_score + impact_score + resilience_score
+
+    level = np.digitize(composite, PRIORITY_THRESHOLDS)
+
+    rounded = [round(float(c), 1) for c in composite]
+    order = sorted(range(n), key=rounded.__getitem__, reverse=True)
+
+    scored_assessments = []
+    for rank, i in enumerate(order, 1):
+        priority = PRIORITY_LEVELS[level[i]]
+        scored_assessments.append({
+            **assessments[i],
+            'composite_score': rounded[i],
+            'priority': priority,
+            'priority_color': PRIORITY_COLORS[priority],
+            'breakdown': {
+                'probability': round(float(prob_score[i]), 1),
+                'vulnerability': round(float(vuln_score[i]), 1),
+                'impact_potential': round(float(impact_score[i]), 1),
+                'resilience_gap': round(float(resilience_score[i]), 1)
+            },
+            'raw_values': {
+                'probability': assessments[i].get('probability', 0.5),
+                'vulnerability': assessments[i].get('vulnerability', 0.5),
+                'resilience': assessments[i].get('resilience', 0.3),
+                'criticality': assessments[i].get('criticality_per_day', 0),
+                'downtime': assessments[i].get('expected_downtime', 5)
+            },
+            'rank': rank
+        })
 
     return scored_assessments
 
@@ -479,8 +558,10 @@ def generate_vulnerability_map(processes: List[Dict],
 
     # Calculate summary statistics
     scores = [p['vulnerability_score'] for p in process_vulnerabilities]
-    critical_processes = len([s for s in scores if s >= 70])
-    high_risk_processes = len([s for s in scores if 50 <= s < 70])
+    bands = np.bincount(np.digitize(scores, PRIORITY_THRESHOLDS),
+                        minlength=len(PRIORITY_LEVELS))
+    critical_processes = int(bands[3])
+    high_risk_processes = int(bands[2])
 
     return {
         'processes': process_vulnerabilities,
@@ -520,10 +601,34 @@ def generate_prioritization_recommendations(assessments: List[Dict],
     # Get vulnerability map
     vuln_map = generate_vulnerability_map(processes, assessments)
 
+    # Single pass over the ranked assessments: priority counts, score total,
+    # critical items and quick wins (high impact, low effort)
+    priority_counts = Counter()
+    score_total = 0.0
+    critical_items = []
+    quick_wins = []
+    for a in ranked_assessments:
+        priority_counts[a['priority']] += 1
+        score_total += a['composite_score']
+        if a['priority'] == 'Critical':
+            critical_items.append(a)
+        if (a['breakdown']['resilience_gap'] > 15  # Low resilience
+                and a['breakdown']['vulnerability'] > 15  # High vulnerability
+                and a.get('resilience', 0.3) < 0.4):  # Room for improvement
+            quick_wins.append(a)
+
+    # Single pass over the vulnerability map
+    concentrated_processes = []
+    high_value_vulnerable = []
+    for p in vuln_map['processes']:
+        if p['concentration_risk'] == 'High':
+            concentrated_processes.append(p)
+        if p.get('criticality', 0) > 10000 and p['vulnerability_score'] > 50:
+            high_value_vulnerable.append(p)
+
     recommendations = []
 
     # 1. Critical priority items
-    critical_items = [a for a in ranked_assessments if a['priority'] == 'Critical']
     if critical_items:
         recommendations.append({
             'type': 'critical_alert',
@@ -541,10 +646,6 @@ def generate_prioritization_recommendations(assessments: List[Dict],
         })
 
     # 2. Process concentration warnings
-    concentrated_processes = [
-        p for p in vuln_map['processes']
-        if p['concentration_risk'] == 'High'
-    ]
     if concentrated_processes:
         recommendations.append({
             'type': 'concentration_warning',
@@ -561,10 +662,6 @@ def generate_prioritization_recommendations(assessments: List[Dict],
         })
 
     # 3. High-value process protection
-    high_value_vulnerable = [
-        p for p in vuln_map['processes']
-        if p['criticality'] > 10000 and p['vulnerability_score'] > 50
-    ]
     if high_value_vulnerable:
         recommendations.append({
             'type': 'high_value_warning',
@@ -582,12 +679,6 @@ def generate_prioritization_recommendations(assessments: List[Dict],
         })
 
     # 4. Quick wins (high impact, low effort)
-    quick_wins = [
-        a for a in ranked_assessments
-        if a['breakdown']['resilience_gap'] > 15  # Low resilience
-        and a['breakdown']['vulnerability'] > 15  # High vulnerability
-        and a.get('resilience', 0.3) < 0.4  # Room for improvement
-    ]
     if quick_wins:
         recommendations.append({
             'type': 'quick_wins',
@@ -606,7 +697,7 @@ def generate_prioritization_recommendations(assessments: List[Dict],
 
     # 5. Summary statistics
     total_exposure = sum(a.get('exposure', 0) for a in assessments)
-    avg_score = sum(a['composite_score'] for a in ranked_assessments) / len(ranked_assessments)
+    avg_score = score_total / len(ranked_assessments)
 
     return {
         'recommendations': recommendations,
@@ -614,10 +705,10 @@ def generate_prioritization_recommendations(assessments: List[Dict],
             'total_assessments': len(assessments),
             'total_exposure': total_exposure,
             'average_priority_score': round(avg_score, 1),
-            'critical_count': len([a for a in ranked_assessments if a['priority'] == 'Critical']),
-            'high_count': len([a for a in ranked_assessments if a['priority'] == 'High']),
-            'medium_count': len([a for a in ranked_assessments if a['priority'] == 'Medium']),
-            'low_count': len([a for a in ranked_assessments if a['priority'] == 'Low'])
+            'critical_count': priority_counts['Critical'],
+            'high_count': priority_counts['High'],
+            'medium_count': priority_counts['Medium'],
+            'low_count': priority_counts['Low']
         },
         'top_10_priorities': ranked_assessments[:10],
         'generated_at': datetime.now().isoformat()
@@ -630,21 +721,9 @@ def generate_prioritization_recommendations(assessments: List[Dict],
 
 def get_priority_color(priority: str) -> str:
     """Get color for priority level."""
-    colors = {
-        'Critical': '#dc3545',
-        'High': '#fd7e14',
-        'Medium': '#ffc107',
-        'Low': '#28a745'
-    }
-    return colors.get(priority, '#6c757d')
+    return PRIORITY_COLORS.get(priority, '#6c757d')
 
 
 def get_priority_icon(priority: str) -> str:
     """Get icon for priority level."""
-    icons = {
-        'Critical': '🔴',
-        'High': '🟠',
-        'Medium': '🟡',
-        'Low': '🟢'
-    }
-    return icons.get(priority, '⚪')
+    return PRIORITY_ICONS.get(priority, '⚪')
@@ -6,36 +6,31 @@ Now with dynamic probability calculations from external data.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sys
-import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 
 APP_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(APP_DIR))
 
-from utils.constants import RISK_DOMAINS
+from utils.constants import RISK_DOMAINS, ITEMS_PER_PAGE
 from utils.helpers import (
     load_risk_database,
-    get_domain_color,
     get_domain_icon,
     format_percentage
 )
 from modules.database import (
     get_client,
-    get_client_processes,
     get_all_clients,
-    add_client_risk,
-    get_client_risks,
-    update_client_risk,
+    add_client_risks_bulk,
+    get_client_risk_ids,
     is_backend_online
 )
 from modules.api_client import fetch_probabilities
-from modules.probability_engine import (
-    calculate_all_probabilities,
-    get_probability_summary,
-    explain_probability
-)
-from modules.external_data import fetch_all_external_data
 
 st.set_page_config(
     page_title="Risk Selection | PRISM Brain",
@@ -44,14 +39,33 @@ st.set_page_config(
 )
 
 
+# Scale for storing probabilities as uint16 in session state
+PROB_Q_SCALE = 65535
+
+# Cache key component so auto-fetched probabilities refresh when the risk database changes
+RISK_DB_VERSION = int((APP_DIR / "data" / "risk_database.json").stat().st_mtime)
+
+# Buckets for the probability distribution chart
+PROB_HIST_BINS = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+PROB_HIST_LABELS = ["0-20%", "20-40%", "40-60%", "60-80%", "80-100%"]
+
+# Percentages are sent as numbers and formatted client-side (also keeps column sorting numeric)
+PERCENT_COLUMN = st.column_config.NumberColumn(format="%.1f%%")
+
+# Column layout of the risk selection XLSX export (also expected on upload)
+EXPORT_COLUMNS = ('Domain', 'Event ID', 'Event Name', 'Probability (%)', 'Selected')
+
+
 def _normalize_risks(risks):
     """Normalize risk database keys for internal use.
 
     The raw risk_database.json uses keys like Event_ID, Event_Name, Layer_1_Primary, etc.
     This function adds short aliases (id, name, domain, etc.) so the rest of the code
-    can use simpler key names consistently.
+    can use simpler key names consistently. Works on copies: the loaded database is shared.
     """
-    for r in risks:
+    normalized = []
+    for risk in risks:
+        r = dict(risk)
         r['id'] = r.get('Event_ID', '')
         r['name'] = r.get('Event_Name', '')
         r['domain'] = r.get('Layer_1_Primary', 'Operational')
@@ -60,7 +74,296 @@ def _normalize_risks(risks):
         r['default_probability'] = r.get('base_probability', r.get('Baseline_Probability', 0))
         r['impact_level'] = r.get('base_impact', r.get('Baseline_Impact', 'Medium'))
         r['risk_name'] = r['name']  # alias used by probability engine
-    return risks
+        normalized.append(r)
+    return normalized
+
+
+def _store_probabilities(raw_probs, merge=False, drop=()):
+    """Normalize probabilities once and store them in session state.
+
+    Accepts either {risk_id: float} or {risk_id: {'probability': ..., ...}} and
+    stores the metadata dict, a quantized uint16 array for summary math and the
+    plain {risk_id: float} mapping used by per-risk renders. With merge=True the
+    new entries are added to the probabilities already stored, after removing
+    the ids in drop.
+    """
+    meta = dict(st.session_state.prob_meta) if merge else {}
+    for risk_id in drop:
+        meta.pop(risk_id, None)
+    meta.update(
+        (risk_id, v if isinstance(v, dict) else {'probability': float(v)})
+        for risk_id, v in raw_probs.items()
+    )
+    prob_array = np.fromiter(
+        (m.get('probability', 0.0) for m in meta.values()),
+        dtype=np.float64,
+        count=len(meta)
+    )
+    st.session_state.prob_meta = meta
+    # Quantized copy: uint16 keeps ~0.0015% resolution at a quarter of float64 size
+    st.session_state.prob_q = np.round(np.clip(prob_array, 0.0, 1.0) * PROB_Q_SCALE).astype(np.uint16)
+    st.session_state.calculated_probabilities = dict(zip(meta.keys(), prob_array.tolist()))
+
+
+def _prob_array():
+    """Dequantize the stored probabilities into a float array for summary math."""
+    return st.session_state.prob_q.astype(np.float32) * (1 / PROB_Q_SCALE)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_all_clients():
+    """Cache the client list for the sidebar selector."""
+    return get_all_clients()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_client(client_id):
+    """Cache the client record so each rerun does one lookup at most."""
+    return get_client(client_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _prioritized_ids(client_id):
+    """Cache the IDs of a client's prioritized risks."""
+    return frozenset(get_client_risk_ids(client_id, prioritized_only=True))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _auto_probs(client_id, db_version, risk_ids):
+    """Cache backend probabilities for a client's selected risks per risk database version.
+
+    risk_ids is a sorted tuple, so the fetch goes through the batch endpoint
+    instead of pulling the whole catalog.
+    """
+    if not risk_ids:
+        return {}
+    return fetch_probabilities(ids=list(risk_ids)) or {}
+
+
+def _prefetch_probabilities():
+    """Warm the backend probability cache in a background thread.
+
+    The fetch overlaps with the sidebar's client lookups; _auto_probs() in the
+    Probabilities tab then waits on the same cache entry instead of refetching.
+    """
+    auto_key = (st.session_state.current_client_id, RISK_DB_VERSION)
+    if (auto_key in (st.session_state.auto_probs_key, st.session_state.auto_probs_prefetched)
+            or not st.session_state.use_dynamic_probabilities):
+        return
+    # Recorded before starting so an empty or failed fetch isn't retried on every rerun
+    st.session_state.auto_probs_prefetched = auto_key
+    risk_ids = tuple(sorted(st.session_state.selected_risks))
+
+    def _warm():
+        if is_backend_online():
+            _auto_probs(*auto_key, risk_ids)
+
+    thread = threading.Thread(target=_warm, daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _external_data(industry, region, day):
+    """Cache the aggregated external data per client profile and calendar day."""
+    from modules.external_data import fetch_all_external_data
+    return fetch_all_external_data(client_industry=industry, client_region=region)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _local_probabilities(risk_ids, industry, region, day, db_version):
+    """Cache local engine results per selection, client profile and external data snapshot."""
+    from modules.probability_engine import calculate_all_probabilities
+    _, risks_by_id = _load_risks_indexed(db_version)
+    client_data = {'industry': industry, 'region': region}
+    result = calculate_all_probabilities(
+        [risks_by_id[rid] for rid in risk_ids],
+        client_data,
+        external_data=_external_data(industry, region, day)
+    )
+    return result.get('probabilities', {})
+
+
+def _calculate_local_probabilities(selected_risks, client):
+    """Calculate probabilities locally from external data."""
+    return _local_probabilities(
+        tuple(sorted(r['id'] for r in selected_risks)),
+        client.get('industry', 'general'),
+        client.get('region', 'global'),
+        date.today().isoformat(),
+        RISK_DB_VERSION
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _calc_executor():
+    """Worker pool for probability calculations, shared across reruns and sessions."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="prob-calc")
+
+
+def _compute_probabilities(client, selected_risks, known_ids, use_backend):
+    """Run one calculation off the script thread.
+
+    Returns (probabilities, ids_to_drop). Touches no session state, so it is
+    safe to run on the worker pool.
+    """
+    selected_ids = [r['id'] for r in selected_risks]
+    # Deselected risks are dropped whichever source computes the new ones
+    removed = known_ids - set(selected_ids)
+
+    if use_backend and is_backend_online():
+        # Only fetch risks we don't have yet; if all are present,
+        # refetch them and let the API cache TTL decide staleness
+        needed = [rid for rid in selected_ids if rid not in known_ids]
+        backend_probs = fetch_probabilities(ids=needed or selected_ids, use_cache=True)
+        if backend_probs:
+            return backend_probs, removed
+
+    # Only compute risks added since the last run
+    new_risks = [r for r in selected_risks if r['id'] not in known_ids]
+    new_probs = _calculate_local_probabilities(new_risks, client) if new_risks else {}
+    return new_probs, removed
+
+
+@st.fragment(run_every=0.5)
+def _calculation_status():
+    """Poll the running calculation without rerunning the rest of the page."""
+    calc_key, future = st.session_state.calc_job
+    if not future.done():
+        st.info("\u23F3 Calculating probabilities in the background...")
+        return
+
+    st.session_state.calc_job = None
+    if calc_key[0] != st.session_state.current_client_id:
+        # Started for a client that is no longer selected: its results don't apply
+        st.rerun()
+    try:
+        probs, removed = future.result()
+        _store_probabilities(probs, merge=True, drop=removed)
+        st.session_state.last_calc_key = calc_key
+        st.session_state.calc_message = ('success', "Probabilities calculated successfully!")
+    except Exception as e:
+        st.session_state.calc_message = ('error', f"Error calculating probabilities: {str(e)}")
+    st.rerun()
+
+
+# The risk catalog structures below are read-only and rebuilt only when the risk DB
+# version changes, so they are cached as resources: st.cache_data would unpickle a
+# fresh copy of each on every rerun.
+@st.cache_resource(ttl=24 * 60 * 60, show_spinner=False)
+def _load_risks(db_version):
+    """Load and normalize the risk database once per risk DB version."""
+    return _normalize_risks(load_risk_database())
+
+
+@st.cache_resource(show_spinner=False)
+def _risk_df(db_version):
+    """Load the normalized risk database once as a DataFrame for vectorized filtering."""
+    return pd.DataFrame(_load_risks(db_version))
+
+
+@st.cache_resource(show_spinner=False)
+def _load_risks_indexed(db_version):
+    """Normalized risks plus an Event_ID -> risk index; keyed on the risk DB version."""
+    risks = _load_risks(db_version)
+    return risks, {r['id']: r for r in risks}
+
+
+@st.cache_resource(show_spinner=False)
+def _valid_risk_ids(db_version):
+    """Frozen set of catalog Event_IDs for validating uploads, built once per risk DB version."""
+    return frozenset(_load_risks_indexed(db_version)[1])
+
+
+def _selected_risks(risks_by_id):
+    """Resolve the current selection through the id index instead of scanning the catalog."""
+    return [risks_by_id[rid] for rid in st.session_state.selected_risks if rid in risks_by_id]
+
+
+def _set_selection(risk_ids):
+    """Button on_click callback: replace the selection before the rerun renders any tab."""
+    st.session_state.selected_risks = set(risk_ids)
+    st.session_state.risk_editor_rev += 1
+
+
+def _add_to_selection(risk_ids):
+    """Button on_click callback: add risks to the selection as it stands at click time."""
+    st.session_state.selected_risks |= set(risk_ids)
+    st.session_state.risk_editor_rev += 1
+
+
+def _risk_payloads(risks):
+    """Build add_client_risks_bulk rows for the given risks, using calculated probabilities."""
+    probs = st.session_state.calculated_probabilities
+    return [
+        {
+            'risk_id': r['id'],
+            'risk_name': r['name'],
+            'domain': r['domain'],
+            'category': r.get('Layer_2_Primary', ''),
+            'probability': probs.get(r['id'], r.get('default_probability', 0)),
+            'is_prioritized': 1,
+        }
+        for r in risks
+    ]
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _export_bytes(db_version, risk_ids, probs):
+    """Build the selection XLSX once per selection/probabilities, streaming rows with xlsxwriter.
+
+    constant_memory mode flushes each row as it is written, which requires
+    row-by-row writes (DataFrame.to_excel writes column-wise). The result is
+    immutable bytes, so it is cached as a resource and handed out without the
+    per-rerun copy st.cache_data makes when unpickling.
+    """
+    import io
+    import xlsxwriter
+    _, risks_by_id = _load_risks_indexed(db_version)
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Risk Selection')
+    worksheet.write_row(0, 0, EXPORT_COLUMNS)
+    for row, (rid, prob) in enumerate(zip(risk_ids, probs), start=1):
+        risk = risks_by_id[rid]
+        worksheet.write_row(row, 0, (risk['domain'], rid, risk['name'], round(prob * 100, 2), 'Yes'))
+    workbook.close()
+    with output:
+        return output.getvalue()
+
+
+@st.cache_resource(show_spinner=False)
+def _risk_index(db_version):
+    """Row positions per domain plus lowercase names and super-risk flags, built once."""
+    risk_df = _risk_df(db_version)
+    by_domain = {
+        domain: np.asarray(rows, dtype=np.intp)
+        for domain, rows in risk_df.groupby('domain', sort=False).indices.items()
+    }
+    names_lc = np.array(risk_df['name'].str.lower().tolist(), dtype=str)
+    is_super = (risk_df['Super_Risk'] == 'YES').to_numpy()
+    # Shared across sessions, so make accidental in-place edits fail loudly
+    for arr in (*by_domain.values(), names_lc, is_super):
+        arr.setflags(write=False)
+    return by_domain, names_lc, is_super
+
+
+def _filter_rows(db_version, selected_domain, search_term):
+    """Row positions matching the domain filter (bucket pick) and name search (one np.char scan)."""
+    by_domain, names_lc, _ = _risk_index(db_version)
+    if selected_domain != "All Domains":
+        rows = by_domain.get(selected_domain, np.empty(0, dtype=np.intp))
+    else:
+        rows = np.arange(names_lc.size)
+    if search_term:
+        rows = rows[np.char.find(names_lc[rows], search_term.lower()) >= 0]
+    return rows
+
+
+def _percent_values(values):
+    """Probabilities as float32 percentages; the browser formats them via PERCENT_COLUMN."""
+    return (np.asarray(values, dtype=np.float64) * 100).astype(np.float32)
+
 
 # Initialize session state
 if 'current_client_id' not in st.session_state:
@@ -72,17 +375,52 @@ if 'selected_risks' not in st.session_state:
 if 'calculated_probabilities' not in st.session_state:
     st.session_state.calculated_probabilities = {}
 
-if 'backend_probs_auto_fetched' not in st.session_state:
-    st.session_state.backend_probs_auto_fetched = False
+if 'prob_q' not in st.session_state:
+    st.session_state.prob_q = np.empty(0, dtype=np.uint16)
+
+if 'prob_meta' not in st.session_state:
+    st.session_state.prob_meta = {}
+
+if 'auto_probs_key' not in st.session_state:
+    st.session_state.auto_probs_key = None
+
+if 'auto_probs_prefetched' not in st.session_state:
+    st.session_state.auto_probs_prefetched = None
+
+if 'last_calc_key' not in st.session_state:
+    st.session_state.last_calc_key = None
+
+# (calc_key, future) while a probability calculation runs on the worker pool
+if 'calc_job' not in st.session_state:
+    st.session_state.calc_job = None
+
+# Bumped whenever the selection changes outside the editor so stale edits are dropped
+if 'risk_editor_rev' not in st.session_state:
+    st.session_state.risk_editor_rev = 0
 
 if 'use_dynamic_probabilities' not in st.session_state:
     st.session_state.use_dynamic_probabilities = True
 
 
+def _drop_selection_widget_state():
+    """Remove the previous client's risk editor state and any legacy per-risk checkbox keys.
+
+    The selection itself lives only in st.session_state.selected_risks.
+    """
+    valid_ids = _valid_risk_ids(RISK_DB_VERSION)
+    stale = [
+        key for key in st.session_state
+        if (key.startswith('risk_editor_') and key != 'risk_editor_rev')
+        or (key.startswith('risk_') and key[len('risk_'):] in valid_ids)
+    ]
+    for key in stale:
+        del st.session_state[key]
+
+
 def client_selector_sidebar():
     """Sidebar for client selection."""
     st.sidebar.header("\U0001F3E2 Current Client")
-    clients = get_all_clients()
+    clients = _cached_get_all_clients()
 
     if not clients:
         st.sidebar.warning("No clients created yet")
@@ -102,22 +440,27 @@ def client_selector_sidebar():
 
     if selected_id != st.session_state.current_client_id:
         st.session_state.current_client_id = selected_id
-        existing_risks = get_client_risks(selected_id, prioritized_only=True)
-        st.session_state.selected_risks = set(r['risk_id'] for r in existing_risks)
-        st.rerun()
+        # Probabilities depend on the client, so drop the previous client's results
+        _store_probabilities({})
+        st.session_state.auto_probs_key = None
+        st.session_state.calc_job = None
+        _drop_selection_widget_state()
+        new_ids = _prioritized_ids(selected_id)
+        if new_ids != st.session_state.selected_risks:
+            st.session_state.selected_risks = set(new_ids)
+            st.session_state.risk_editor_rev += 1
+            st.rerun()
 
     if st.session_state.current_client_id:
-        client = get_client(st.session_state.current_client_id)
+        client = _cached_get_client(st.session_state.current_client_id)
         st.sidebar.divider()
         st.sidebar.markdown(f"**\U0001F4CD {client.get('location', 'N/A')}**")
         st.sidebar.markdown(f"\U0001F3ED {client.get('industry', 'N/A')}")
         st.sidebar.markdown(f"\U0001F4CA {client.get('sectors', 'N/A')}")
 
 
-def risk_selection_interface():
+def risk_selection_interface(client, risks_by_id):
     """Main risk selection interface."""
-    client = get_client(st.session_state.current_client_id)
-    risks = _normalize_risks(load_risk_database())
 
     st.markdown(f"## Select Risks for {client['name']}")
     st.markdown(f"Select the risks you want to assess for {client['name']}.")
@@ -136,107 +479,81 @@ def risk_selection_interface():
             key="risk_search"
         )
 
-    # Filter risks
-    filtered_risks = risks
-
-    if selected_domain != "All Domains":
-        filtered_risks = [r for r in filtered_risks if r['domain'] == selected_domain]
-
-    if search_term:
-        filtered_risks = [
-            r for r in filtered_risks
-            if search_term.lower() in r['name'].lower()
-        ]
+    # Filter through the cached domain index and lowercase name array
+    risk_df = _risk_df(RISK_DB_VERSION)
+    rows = _filter_rows(RISK_DB_VERSION, selected_domain, search_term)
+    total_filtered = int(rows.size)
+    total_pages = max(1, -(-total_filtered // ITEMS_PER_PAGE))
 
     # Bulk action buttons
     col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("\u2713 Select All Super Risks"):
-            super_risks = [r['id'] for r in filtered_risks if r.get('is_super_risk', False)]
-            st.session_state.selected_risks.update(super_risks)
-            st.rerun()
+        is_super = _risk_index(RISK_DB_VERSION)[2]
+        st.button(
+            "\u2713 Select All Super Risks",
+            on_click=_add_to_selection,
+            args=(tuple(risk_df['id'].to_numpy()[rows[is_super[rows]]]),)
+        )
     with col2:
-        if st.button("\u2717 Clear Selection"):
-            st.session_state.selected_risks.clear()
-            st.rerun()
+        st.button("\u2717 Clear Selection", on_click=_set_selection, args=((),))
     with col3:
         st.write("")  # Placeholder for layout
 
     # Risk selection table
-    st.subheader(f"Available Risks ({len(filtered_risks)})")
-
-    # Display risks in a table
-    header_cols = st.columns([1, 3, 2, 2])
-    with header_cols[0]:
-        st.write("**Select**")
-    with header_cols[1]:
-        st.write("**Risk Name**")
-    with header_cols[2]:
-        st.write("**Domain**")
-    with header_cols[3]:
-        st.write("**Probability**")
-
-    st.divider()
-
-    for risk in filtered_risks:
-        risk_id = risk['id']
-        cols = st.columns([1, 3, 2, 2])
-
-        with cols[0]:
-            is_selected = risk_id in st.session_state.selected_risks
-            new_value = st.checkbox(
-                "Select",
-                value=is_selected,
-                key=f"risk_{risk_id}",
-                label_visibility="collapsed"
-            )
-            if new_value != is_selected:
-                if new_value:
-                    st.session_state.selected_risks.add(risk_id)
-                else:
-                    st.session_state.selected_risks.discard(risk_id)
-
-        with cols[1]:
-            domain_color = get_domain_color(risk['domain'])
-            domain_icon = get_domain_icon(risk['domain'])
-            st.markdown(f"{domain_icon} **{risk['name']}**")
-
-        with cols[2]:
-            st.write(risk['domain'])
-
-        with cols[3]:
-            prob = st.session_state.calculated_probabilities.get(
-                risk_id,
-                risk.get('default_probability', 0)
-            )
-            st.write(f"{format_percentage(prob)}")
+    st.subheader(f"Available Risks ({total_filtered})")
+
+    if st.session_state.get('risk_page', 1) > total_pages:
+        st.session_state.risk_page = total_pages
+    page = st.number_input(
+        f"Page (of {total_pages})",
+        min_value=1,
+        max_value=total_pages,
+        key="risk_page"
+    )
+    start_idx = (page - 1) * ITEMS_PER_PAGE
+    end_idx = start_idx + ITEMS_PER_PAGE
+    page_risks = risk_df.iloc[rows[start_idx:end_idx]]
+
+    # Render the page as one data_editor with a checkbox column instead of a widget row per risk
+    selected = st.session_state.selected_risks
+    probs = st.session_state.calculated_probabilities
+    page_ids = page_risks['id'].tolist()
+    icons = page_risks['domain'].map(get_domain_icon)
+    page_df = pd.DataFrame({
+        'Selected': [rid in selected for rid in page_ids],
+        'Risk Name': (icons + ' ' + page_risks['name']).to_numpy(),
+        'Domain': page_risks['domain'].to_numpy(),
+        'Probability': _percent_values([
+            probs.get(rid, default)
+            for rid, default in zip(page_ids, page_risks['default_probability'].tolist())
+        ]),
+    })
+    edited = st.data_editor(
+        page_df,
+        column_config={"Selected": st.column_config.CheckboxColumn("Select"), "Probability": PERCENT_COLUMN},
+        disabled=["Risk Name", "Domain", "Probability"],
+        hide_index=True,
+        use_container_width=True,
+        key=f"risk_editor_{st.session_state.risk_editor_rev}_{selected_domain}_{search_term}_{page}"
+    )
+    selected.difference_update(page_ids)
+    selected.update(rid for rid, keep in zip(page_ids, edited['Selected']) if keep)
 
     # Save selected risks
     if st.button("\U0001F4BE Save Risk Selection", key="save_risks"):
-        for risk_id in st.session_state.selected_risks:
-            risk = next((r for r in risks if r['id'] == risk_id), None)
-            if risk:
-                add_client_risk(
-                    st.session_state.current_client_id,
-                    risk_id,
-                    {
-                        'name': risk['name'],
-                        'domain': risk['domain'],
-                        'description': risk.get('description', ''),
-                        'impact_level': risk.get('impact_level', 'Medium'),
-                        'mitigation_ideas': risk.get('mitigation_ideas', [])
-                    }
-                )
+        add_client_risks_bulk(
+            st.session_state.current_client_id,
+            _risk_payloads(_selected_risks(risks_by_id))
+        )
+        _prioritized_ids.clear()
         st.success(f"Saved {len(st.session_state.selected_risks)} risks!")
 
 
-def probability_calculation_interface():
+def probability_calculation_interface(client, risks_by_id):
     """Interface for probability calculations."""
     st.subheader("\U0001F4CA Calculate Probabilities")
 
-    client = get_client(st.session_state.current_client_id)
-    risks = _normalize_risks(load_risk_database())
-    selected_risks = [r for r in risks if r['id'] in st.session_state.selected_risks]
+    selected_risks = _selected_risks(risks_by_id)
 
     if not selected_risks:
         st.info("Select risks in the 'Select Risks' tab to calculate probabilities.")
@@ -254,22 +571,50 @@ def probability_calculation_interface():
 
     st.divider()
 
-    # Calculate probabilities
+    # Auto-load backend probabilities once per client / risk database version
+    auto_key = (st.session_state.current_client_id, RISK_DB_VERSION)
+    if (st.session_state.auto_probs_key != auto_key
+            and st.session_state.use_dynamic_probabilities and is_backend_online()):
+        auto_probs = _auto_probs(*auto_key, tuple(sorted(st.session_state.selected_risks)))
+        if auto_probs:
+            _store_probabilities(auto_probs)
+        # Recorded even when the backend had nothing, so the load isn't retried every rerun
+        st.session_state.auto_probs_key = auto_key
+
+    # Calculate probabilities (skipped when neither the client nor the selection changed)
+    calc_key = (
+        st.session_state.current_client_id,
+        frozenset(st.session_state.selected_risks),
+        st.session_state.use_dynamic_probabilities
+    )
     if st.button("\U0001F504 Calculate All Probabilities"):
-        with st.spinner("Calculating probabilities..."):
-            try:
-                external_data = fetch_all_external_data(client)
-                probs = calculate_all_probabilities(
-                    selected_risks,
-                    client,
-                    external_data,
-                    use_dynamic=st.session_state.use_dynamic_probabilities
-                )
-                st.session_state.calculated_probabilities = probs
-                st.success("Probabilities calculated successfully!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error calculating probabilities: {str(e)}")
+        if st.session_state.calc_job is not None:
+            st.info("A calculation is already running.")
+        elif (calc_key == st.session_state.last_calc_key
+                and st.session_state.calculated_probabilities):
+            st.info("Probabilities are already up to date for this selection.")
+        else:
+            # Run on the worker pool so the rest of the page stays interactive
+            future = _calc_executor().submit(
+                _compute_probabilities,
+                client,
+                selected_risks,
+                frozenset(st.session_state.prob_meta),
+                st.session_state.use_dynamic_probabilities
+            )
+            st.session_state.calc_job = (calc_key, future)
+
+    if st.session_state.calc_job is not None:
+        _calculation_status()
+
+    # Outcome of a calculation that finished on the previous rerun
+    calc_message = st.session_state.pop('calc_message', None)
+    if calc_message:
+        level, text = calc_message
+        if level == 'error':
+            st.error(text)
+        else:
+            st.success(text)
 
     if not st.session_state.calculated_probabilities:
         st.info("Click 'Calculate All Probabilities' to compute risk probabilities")
@@ -278,34 +623,54 @@ def probability_calculation_interface():
     # Display probability results
     st.subheader("Probability Results")
 
-    results_data = []
-    for risk in selected_risks:
-        prob = st.session_state.calculated_probabilities.get(
-            risk['id'],
-            risk.get('default_probability', 0)
-        )
-        results_data.append({
-            'Risk Name': risk['name'],
-            'Domain': risk['domain'],
-            'Probability (%)': f"{format_percentage(prob)}",
-            'Raw Value': prob
-        })
-
-    results_df = pd.DataFrame(results_data)
-    results_df = results_df.sort_values('Raw Value', ascending=False)
-    st.dataframe(results_df[['Risk Name', 'Domain', 'Probability (%)']], use_container_width=True)
+    prob_array = _prob_array()
+    if prob_array.size:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Events Calculated", int(prob_array.size))
+        with col2:
+            st.metric("Average Probability", format_percentage(float(prob_array.mean())))
+        with col3:
+            st.metric("High Probability (\u226570%)", int(np.count_nonzero(prob_array >= 0.7)))
+
+        # Lightweight 5-bucket distribution (vega-lite via st.bar_chart, no plotly figure)
+        counts, _ = np.histogram(prob_array, bins=PROB_HIST_BINS)
+        chart_df = pd.DataFrame({'count': counts}, index=PROB_HIST_LABELS)
+        st.bar_chart(chart_df, height=300)
+
+    # Build the results table column-wise and sort with one argsort
+    probs = st.session_state.calculated_probabilities
+    raw = np.fromiter(
+        (probs.get(r['id'], r.get('default_probability', 0)) for r in selected_risks),
+        dtype=np.float64,
+        count=len(selected_risks)
+    )
+    results_df = pd.DataFrame({
+        'Risk Name': [r['name'] for r in selected_risks],
+        'Domain': [r['domain'] for r in selected_risks],
+        'Probability (%)': _percent_values(raw)
+    })
+    results_df = results_df.iloc[np.argsort(-raw, kind='stable')]
+    st.dataframe(results_df, column_config={'Probability (%)': PERCENT_COLUMN}, use_container_width=True)
 
     # Probability details
     if st.checkbox("Show Probability Details"):
-        for risk in selected_risks:
-            prob = st.session_state.calculated_probabilities.get(risk['id'])
-            if prob is not None:
-                with st.expander(f"{risk['name']} - {format_percentage(prob)}"):
-                    explanation = explain_probability(risk, prob)
-                    st.write(explanation)
+        from modules.probability_engine import explain_probability
+        # Render a single breakdown on demand instead of one expander per risk
+        prob_meta = st.session_state.prob_meta
+        detail_risks = {r['id']: r for r in selected_risks if r['id'] in prob_meta}
+        if detail_risks:
+            expanded_risk_id = st.selectbox(
+                "Risk",
+                options=list(detail_risks.keys()),
+                format_func=lambda x: f"{detail_risks[x]['name']} - "
+                                      f"{format_percentage(prob_meta[x].get('probability', 0))}",
+                key="expanded_risk_id"
+            )
+            st.write(explain_probability(detail_risks[expanded_risk_id], prob_meta[expanded_risk_id]))
 
 
-def save_risks_interface():
+def save_risks_interface(client, risks_by_id):
     """Interface for saving risk selections."""
     st.subheader("\U0001F4BE Save Risk Selections")
 
@@ -313,45 +678,30 @@ def save_risks_interface():
         st.warning("No risks selected yet. Select risks in the 'Select Risks' tab.")
         return
 
-    client = get_client(st.session_state.current_client_id)
-    risks = _normalize_risks(load_risk_database())
-
-    selected_risks = [r for r in risks if r['id'] in st.session_state.selected_risks]
+    selected_risks = sorted(_selected_risks(risks_by_id), key=lambda r: (r['domain'], r['name']))
 
     st.write(f"**Selected Risks:** {len(selected_risks)}")
 
     # Display selected risks
-    selected_risks_df = pd.DataFrame([
-        {
-            'Risk Name': r['name'],
-            'Domain': r['domain'],
-            'Probability (%)': format_percentage(
-                st.session_state.calculated_probabilities.get(
-                    r['id'],
-                    r.get('default_probability', 0)
-                )
-            )
-        }
-        for r in selected_risks
-    ])
+    probs = st.session_state.calculated_probabilities
+    selected_risks_df = pd.DataFrame({
+        'Risk Name': [r['name'] for r in selected_risks],
+        'Domain': [r['domain'] for r in selected_risks],
+        'Probability (%)': _percent_values([
+            probs.get(r['id'], r.get('default_probability', 0)) for r in selected_risks
+        ])
+    })
 
-    st.dataframe(selected_risks_df, use_container_width=True)
+    st.dataframe(selected_risks_df, column_config={'Probability (%)': PERCENT_COLUMN}, use_container_width=True)
 
     col1, col2 = st.columns(2)
     with col1:
         if st.button("\u2713 Confirm & Save Risks"):
-            for risk in selected_risks:
-                add_client_risk(
-                    st.session_state.current_client_id,
-                    risk['id'],
-                    {
-                        'name': risk['name'],
-                        'domain': risk['domain'],
-                        'description': risk.get('description', ''),
-                        'impact_level': risk.get('impact_level', 'Medium'),
-                        'mitigation_ideas': risk.get('mitigation_ideas', [])
-                    }
-                )
+            add_client_risks_bulk(
+                st.session_state.current_client_id,
+                _risk_payloads(selected_risks)
+            )
+            _prioritized_ids.clear()
             st.success(f"Saved {len(selected_risks)} risks to database!")
 
     with col2:
@@ -359,7 +709,7 @@ def save_risks_interface():
             st.rerun()
 
 
-def import_export_risks():
+def import_export_risks(client, risks_by_id):
     """Interface for importing and exporting risk selections."""
     st.subheader("\U0001F4E5 Import / Export Risk Selections")
 
@@ -367,40 +717,22 @@ def import_export_risks():
         st.warning("Select a client first")
         return
 
-    client = get_client(st.session_state.current_client_id)
-    risks = _normalize_risks(load_risk_database())
-
     # Download section
     st.markdown("### \U0001F4E5 Download Risk Selection")
 
-    selected_risks = [r for r in risks if r['id'] in st.session_state.selected_risks]
+    selected_risks = sorted(_selected_risks(risks_by_id), key=lambda r: (r['domain'], r['id']))
 
     if selected_risks:
-        export_data = []
-        for risk in selected_risks:
-            prob = st.session_state.calculated_probabilities.get(
-                risk['id'],
-                risk.get('default_probability', 0)
-            )
-            export_data.append({
-                'Domain': risk['domain'],
-                'Event ID': risk['id'],
-                'Event Name': risk['name'],
-                'Probability (%)': round(prob * 100, 2),
-                'Selected': 'Yes'
-            })
-
-        export_df = pd.DataFrame(export_data)
-
-        # Create Excel file in memory
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            export_df.to_excel(writer, sheet_name='Risk Selection', index=False)
-        output.seek(0)
+        probs = st.session_state.calculated_probabilities
+        export_bytes = _export_bytes(
+            RISK_DB_VERSION,
+            tuple(r['id'] for r in selected_risks),
+            tuple(probs.get(r['id'], r.get('default_probability', 0)) for r in selected_risks)
+        )
 
         st.download_button(
             label="\u2B07\uFE0F Download Risk Selection (XLSX)",
-            data=output.getvalue(),
+            data=export_bytes,
             file_name=f"{client['name']}_Risk_Selection.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -420,23 +752,24 @@ def import_export_risks():
 
     if uploaded_file:
         try:
-            upload_df = pd.read_excel(uploaded_file, sheet_name='Risk Selection')
+            upload_df = pd.read_excel(
+                uploaded_file,
+                sheet_name='Risk Selection',
+                usecols=['Event ID', 'Selected'],
+                dtype={'Selected': 'string'}
+            )
 
-            # Extract selected risks from upload
-            selected_from_upload = set()
-            for _, row in upload_df.iterrows():
-                if row.get('Selected', '').lower() == 'yes':
-                    event_id = row.get('Event ID')
-                    if event_id and event_id in [r['id'] for r in risks]:
-                        selected_from_upload.add(event_id)
+            # Extract selected risks from upload with one boolean mask
+            valid_ids = _valid_risk_ids(RISK_DB_VERSION)
+            mask = upload_df['Selected'].str.lower().eq('yes').fillna(False)
+            selected_from_upload = set(upload_df.loc[mask, 'Event ID']) & valid_ids
 
             st.write(f"Found {len(selected_from_upload)} selected risks in file")
 
             if selected_from_upload:
-                if st.button("\u2713 Import & Update Selection"):
-                    st.session_state.selected_risks = selected_from_upload
+                if st.button("\u2713 Import & Update Selection",
+                             on_click=_set_selection, args=(selected_from_upload,)):
                     st.success("Risk selection updated!")
-                    st.rerun()
             else:
                 st.warning("No selected risks found in the uploaded file.")
 
@@ -446,6 +779,7 @@ def import_export_risks():
 
 def main():
     """Main application."""
+    _prefetch_probabilities()
     client_selector_sidebar()
 
     if not st.session_state.current_client_id:
@@ -473,17 +807,21 @@ def main():
         "\U0001F4E5 Import / Export"
     ])
 
+    # Resolve the client and risk index once per run and share them across tabs
+    client = _cached_get_client(st.session_state.current_client_id)
+    _, risks_by_id = _load_risks_indexed(RISK_DB_VERSION)
+
     with tab1:
-        probability_calculation_interface()
+        probability_calculation_interface(client, risks_by_id)
 
     with tab2:
-        risk_selection_interface()
+        risk_selection_interface(client, risks_by_id)
 
     with tab3:
-        save_risks_interface()
+        save_risks_interface(client, risks_by_id)
 
     with tab4:
-        import_export_risks()
+        import_export_risks(client, risks_by_id)
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ Input vulnerability, resilience, and downtime for each process-risk combination.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import io
 import sys
 from pathlib import Path
@@ -28,7 +29,8 @@ from modules.database import (
     get_client_risks,
     get_assessments,
     save_assessment,
-    calculate_risk_exposure
+    calculate_risk_exposure,
+    get_data_version
 )
 
 st.set_page_config(
@@ -37,17 +39,126 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_all_clients():
+    """Cached client list for the sidebar selector."""
+    return get_all_clients()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_client(client_id):
+    """Cached client lookup so widget reruns don't re-hit the database."""
+    return get_client(client_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_processes(client_id):
+    """Cached client process lookup."""
+    return get_client_processes(client_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_risks(client_id, prioritized_only=False):
+    """Cached client risk lookup."""
+    return get_client_risks(client_id, prioritized_only=prioritized_only)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_assessments(client_id):
+    """Cached assessment lookup."""
+    return get_assessments(client_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _processes_soa(client_id):
+    """Columnar (struct-of-arrays) view of a client's processes."""
+    processes = _cached_get_processes(client_id) or []
+    return {
+        'ids': np.array([p['id'] for p in processes]),
+        'names': np.array([p['custom_name'] or p['process_name'] for p in processes], dtype=object),
+        'process_names': np.array([p['process_name'] for p in processes], dtype=object),
+        # float64 so exposures match the Results Dashboard to the last currency digit
+        'crit': np.array([p['criticality_per_day'] or 0 for p in processes], dtype=np.float64)
+    }
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _risks_soa(client_id):
+    """Columnar (struct-of-arrays) view of a client's prioritized risks."""
+    risks = _cached_get_risks(client_id, prioritized_only=True) or []
+    return {
+        'ids': np.array([r['id'] for r in risks]),
+        'names': np.array([r['risk_name'] for r in risks], dtype=object),
+        'domains': np.array([r.get('domain', '') for r in risks], dtype=object),
+        'probs': np.array([r['probability'] for r in risks], dtype=np.float64)
+    }
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _compute_matrix_preview(client_id, currency):
+    """Build the process-risk matrix preview; memoized until the next write.
+
+    Every cell starts pending; assessed cells are filled in one vectorized
+    exposure pass.
+    """
+    proc_cols = _processes_soa(client_id)
+    risk_cols = _risks_soa(client_id)
+    proc_index = {pid: i for i, pid in enumerate(proc_cols['ids'].tolist())}
+    risk_index = {rid: j for j, rid in enumerate(risk_cols['ids'].tolist())}
+    assessments = _cached_get_assessments(client_id) or []
+    assessment_lookup = {(a['process_id'], a['risk_id']): a for a in assessments}
+    assessed = [(proc_index[pid], risk_index[rid], a)
+                for (pid, rid), a in assessment_lookup.items()
+                if pid in proc_index and rid in risk_index]
+
+    cells = np.full((len(proc_index), len(risk_index)), "⬜ Pending", dtype=object)
+    if assessed:
+        rows = np.array([i for i, _, _ in assessed], dtype=np.intp)
+        cols = np.array([j for _, j, _ in assessed], dtype=np.intp)
+        exposure = calculate_risk_exposure(
+            proc_cols['crit'][rows],
+            np.array([a['vulnerability'] for _, _, a in assessed], dtype=np.float64),
+            np.array([a['resilience'] for _, _, a in assessed], dtype=np.float64),
+            np.array([a['expected_downtime'] for _, _, a in assessed], dtype=np.float64),
+            risk_cols['probs'][cols]
+        )
+        cells[rows, cols] = [f"✅ {format_currency(e, currency)}" for e in exposure]
+
+    df_matrix = pd.DataFrame(cells, columns=[name[:20] for name in risk_cols['names']])
+    df_matrix = df_matrix.loc[:, ~df_matrix.columns.duplicated(keep='last')]
+    df_matrix.insert(0, "Process", proc_cols['names'])
+    return df_matrix
+
+
+def _clear_cached_lookups():
+    """Invalidate cached lookups after a client switch or a write."""
+    _cached_get_client.clear()
+    _cached_get_processes.clear()
+    _cached_get_risks.clear()
+    _cached_get_assessments.clear()
+    _processes_soa.clear()
+    _risks_soa.clear()
+    _compute_matrix_preview.clear()
+
+
 if 'current_client_id' not in st.session_state:
     st.session_state.current_client_id = None
 
 if 'assessment_mode' not in st.session_state:
     st.session_state.assessment_mode = 'guided'  # 'guided' or 'table'
 
+# Processes and risks are also written on other pages (Process Criticality,
+# Risk Selection); drop the cached lookups whenever any write happened since
+# this page last ran so progress, matrix and batch table include the new rows
+if st.session_state.get('assessment_data_version') != get_data_version():
+    _clear_cached_lookups()
+    st.session_state.assessment_data_version = get_data_version()
+
 
 def client_selector_sidebar():
     """Sidebar for client selection and progress."""
     st.sidebar.header("🏢 Current Client")
-    clients = get_all_clients()
+    clients = _cached_get_all_clients()
 
     if not clients:
         st.sidebar.warning("No clients created")
@@ -65,13 +176,14 @@ def client_selector_sidebar():
 
     if selected_id != st.session_state.current_client_id:
         st.session_state.current_client_id = selected_id
+        _clear_cached_lookups()
         st.rerun()
 
     # Progress indicator
     if st.session_state.current_client_id:
-        processes = get_client_processes(st.session_state.current_client_id)
-        risks = get_client_risks(st.session_state.current_client_id, prioritized_only=True)
-        assessments = get_assessments(st.session_state.current_client_id)
+        processes = _cached_get_processes(st.session_state.current_client_id)
+        risks = _cached_get_risks(st.session_state.current_client_id, prioritized_only=True)
+        assessments = _cached_get_assessments(st.session_state.current_client_id)
 
         total_combinations = len(processes) * len(risks)
         completed = len(assessments)
@@ -96,10 +208,10 @@ def assessment_overview():
         st.warning("Please select a client")
         return
 
-    client = get_client(st.session_state.current_client_id)
-    processes = get_client_processes(st.session_state.current_client_id)
-    risks = get_client_risks(st.session_state.current_client_id, prioritized_only=True)
-    assessments = get_assessments(st.session_state.current_client_id)
+    client = _cached_get_client(st.session_state.current_client_id)
+    processes = _cached_get_processes(st.session_state.current_client_id)
+    risks = _cached_get_risks(st.session_state.current_client_id, prioritized_only=True)
+    assessments = _cached_get_assessments(st.session_state.current_client_id)
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -123,38 +235,11 @@ def assessment_overview():
     # Matrix preview
     st.markdown("### Process-Risk Matrix")
 
-    # Create matrix view
-    matrix_data = []
-
-    # Pre-fetch all assessments from backend (backend-aware)
-    all_assessments_overview = get_assessments(st.session_state.current_client_id) or []
-    assessment_lookup = {(a['process_id'], a['risk_id']): a for a in all_assessments_overview}
-
-    for proc in processes:
-        row = {"Process": proc['custom_name'] or proc['process_name']}
-
-        for risk in risks:
-            # Check if assessment exists (using backend-aware lookup)
-            assessment = assessment_lookup.get((proc['id'], risk['id']))
-
-            if assessment:
-                exposure = calculate_risk_exposure(
-                    proc['criticality_per_day'],
-                    assessment['vulnerability'],
-                    assessment['resilience'],
-                    assessment['expected_downtime'],
-                    risk['probability']
-                )
-                row[risk['risk_name'][:20]] = f"✅ {format_currency(exposure, client['currency'])}"
-            else:
-                row[risk['risk_name'][:20]] = "⬜ Pending"
-
-        matrix_data.append(row)
-
-    df_matrix = pd.DataFrame(matrix_data)
+    df_matrix = _compute_matrix_preview(st.session_state.current_client_id, client['currency'])
     st.dataframe(df_matrix, use_container_width=True, hide_index=True)
 
 
+@st.fragment
 def guided_assessment():
     """Guided step-by-step assessment interface."""
     st.subheader("🎯 Guided Assessment")
@@ -162,9 +247,9 @@ def guided_assessment():
     if not st.session_state.current_client_id:
         return
 
-    client = get_client(st.session_state.current_client_id)
-    processes = get_client_processes(st.session_state.current_client_id)
-    risks = get_client_risks(st.session_state.current_client_id, prioritized_only=True)
+    client = _cached_get_client(st.session_state.current_client_id)
+    processes = _cached_get_processes(st.session_state.current_client_id)
+    risks = _cached_get_risks(st.session_state.current_client_id, prioritized_only=True)
 
     if not processes or not risks:
         st.warning("Please ensure you have selected both processes and risks.")
@@ -174,7 +259,7 @@ def guided_assessment():
     symbol = CURRENCY_SYMBOLS.get(currency, '€')
 
     # Build list of combinations (using backend-aware bulk fetch)
-    all_assessments_guided = get_assessments(st.session_state.current_client_id) or []
+    all_assessments_guided = _cached_get_assessments(st.session_state.current_client_id) or []
     assessment_lookup = {(a['process_id'], a['risk_id']): a for a in all_assessments_guided}
 
     combinations = []
@@ -369,10 +454,12 @@ def assessment_form(process, risk, existing, client):
                 expected_downtime=downtime,
                 notes=notes
             )
+            _clear_cached_lookups()
             st.success("✅ Assessment saved!")
             st.rerun()
 
 
+@st.fragment
 def batch_assessment():
     """Batch assessment table interface."""
     st.subheader("📊 Batch Assessment")
@@ -380,9 +467,9 @@ def batch_assessment():
     if not st.session_state.current_client_id:
         return
 
-    client = get_client(st.session_state.current_client_id)
-    processes = get_client_processes(st.session_state.current_client_id)
-    risks = get_client_risks(st.session_state.current_client_id, prioritized_only=True)
+    client = _cached_get_client(st.session_state.current_client_id)
+    processes = _cached_get_processes(st.session_state.current_client_id)
+    risks = _cached_get_risks(st.session_state.current_client_id, prioritized_only=True)
 
     if not processes or not risks:
         st.warning("Please ensure you have selected both processes and risks.")
@@ -393,30 +480,40 @@ def batch_assessment():
     """)
 
     # Build data for editing - pre-fetch all assessments from backend (backend-aware)
-    all_assessments_batch = get_assessments(st.session_state.current_client_id) or []
+    all_assessments_batch = _cached_get_assessments(st.session_state.current_client_id) or []
     assessment_lookup = {(a['process_id'], a['risk_id']): a for a in all_assessments_batch}
 
-    data = []
-    id_mapping = []  # Store process/risk IDs separately by row index
-
-    for proc in processes:
-        for risk in risks:
-            existing = assessment_lookup.get((proc['id'], risk['id']))
-            data.append({
-                'Process': proc['process_name'][:30],
-                'Risk': risk['risk_name'][:30],
-                'Vulnerability (%)': int(existing['vulnerability'] * 100) if existing else 0,
-                'Resilience (%)': int(existing['resilience'] * 100) if existing else 0,
-                'Downtime (days)': existing['expected_downtime'] if existing else 0
-            })
-
-            # Keep track of IDs separately
-            id_mapping.append({
-                'proc_id': proc['id'],
-                'risk_id': risk['id']
-            })
-
-    df = pd.DataFrame(data)
+    # One row per (process, risk) pair, built column-wise: processes repeat,
+    # risks tile, and existing assessments are scattered in by flat index
+    proc_cols = _processes_soa(st.session_state.current_client_id)
+    risk_cols = _risks_soa(st.session_state.current_client_id)
+    n_procs, n_risks = len(proc_cols['ids']), len(risk_cols['ids'])
+    proc_index = {pid: i for i, pid in enumerate(proc_cols['ids'].tolist())}
+    risk_index = {rid: j for j, rid in enumerate(risk_cols['ids'].tolist())}
+
+    # Percentages and days (0-365) fit in int16, halving the editor payload
+    vulnerability = np.zeros(n_procs * n_risks, dtype=np.int16)
+    resilience = np.zeros(n_procs * n_risks, dtype=np.int16)
+    downtime = np.zeros(n_procs * n_risks, dtype=np.int16)
+    for (pid, rid), existing in assessment_lookup.items():
+        if pid in proc_index and rid in risk_index:
+            k = proc_index[pid] * n_risks + risk_index[rid]
+            vulnerability[k] = int(existing['vulnerability'] * 100)
+            resilience[k] = int(existing['resilience'] * 100)
+            # Nullable in both stores and possibly fractional from the backend
+            downtime[k] = round(existing.get('expected_downtime') or 0)
+
+    # Keep track of IDs separately by row index
+    row_proc_ids = np.repeat(proc_cols['ids'], n_risks).tolist()
+    row_risk_ids = np.tile(risk_cols['ids'], n_procs).tolist()
+
+    df = pd.DataFrame({
+        'Process': np.repeat([name[:30] for name in proc_cols['process_names']], n_risks),
+        'Risk': np.tile([name[:30] for name in risk_cols['names']], n_procs),
+        'Vulnerability (%)': vulnerability,
+        'Resilience (%)': resilience,
+        'Downtime (days)': downtime
+    })
 
     # Editable dataframe - no hidden columns needed
     edited_df = st.data_editor(
@@ -437,13 +534,10 @@ def batch_assessment():
         saved_count = 0
 
         for idx, row in edited_df.iterrows():
-            # Get IDs from our separate mapping using the row index
-            ids = id_mapping[idx]
-
             save_assessment(
                 client_id=st.session_state.current_client_id,
-                process_id=ids['proc_id'],
-                risk_id=ids['risk_id'],
+                process_id=row_proc_ids[idx],
+                risk_id=row_risk_ids[idx],
                 vulnerability=row['Vulnerability (%)'] / 100,
                 resilience=row['Resilience (%)'] / 100,
                 expected_downtime=int(row['Downtime (days)']),
@@ -451,6 +545,7 @@ def batch_assessment():
             )
             saved_count += 1
 
+        _clear_cached_lookups()
         st.success(f"✅ Saved {saved_count} assessments!")
         st.rerun()  # Refresh to show updated values
 
@@ -463,10 +558,10 @@ def import_export_assessments():
         st.warning("Please select a client to continue")
         return
 
-    client = get_client(st.session_state.current_client_id)
-    processes = get_client_processes(st.session_state.current_client_id)
-    risks = get_client_risks(st.session_state.current_client_id, prioritized_only=True)
-    assessments = get_assessments(st.session_state.current_client_id) or []
+    client = _cached_get_client(st.session_state.current_client_id)
+    processes = _cached_get_processes(st.session_state.current_client_id)
+    risks = _cached_get_risks(st.session_state.current_client_id, prioritized_only=True)
+    assessments = _cached_get_assessments(st.session_state.current_client_id) or []
 
     if not processes or not risks:
         st.warning("Please ensure you have selected both processes and risks.")
@@ -483,26 +578,39 @@ def import_export_assessments():
         st.markdown("Export current assessments or download a blank template to fill in.")
 
         if st.button("📥 Download XLSX Template", use_container_width=True):
-            # Build export data
-            assessment_lookup = {(a['process_id'], a['risk_id']): a for a in assessments}
-            export_data = []
-
-            for proc in processes:
-                for risk in risks:
-                    existing = assessment_lookup.get((proc['id'], risk['id']))
-                    export_data.append({
-                        'Process Name': proc['process_name'],
-                        'Process ID': proc['id'],
-                        'Risk Name': risk['risk_name'],
-                        'Risk ID': risk['id'],
-                        'Criticality/Day': proc['criticality_per_day'],
-                        'Probability (%)': risk['probability'] * 100,
-                        'Vulnerability (%)': int(existing['vulnerability'] * 100) if existing else '',
-                        'Resilience (%)': int(existing['resilience'] * 100) if existing else '',
-                        'Downtime (days)': existing['expected_downtime'] if existing else ''
-                    })
-
-            df_export = pd.DataFrame(export_data)
+            # Build export data: cross join processes x risks and left-join the
+            # existing assessments in pandas instead of a nested Python loop
+            proc_df = pd.DataFrame.from_records(
+                [(p['process_name'], p['id'], p['criticality_per_day']) for p in processes],
+                columns=['Process Name', 'Process ID', 'Criticality/Day']
+            )
+            risk_df = pd.DataFrame.from_records(
+                [(r['risk_name'], r['id'], r['probability']) for r in risks],
+                columns=['Risk Name', 'Risk ID', 'Probability (%)']
+            )
+            risk_df['Probability (%)'] *= 100
+            assess_df = pd.DataFrame.from_records(
+                [(a['process_id'], a['risk_id'], a['vulnerability'], a['resilience'], a['expected_downtime'])
+                 for a in assessments],
+                columns=['Process ID', 'Risk ID', 'Vulnerability (%)', 'Resilience (%)', 'Downtime (days)']
+            ).drop_duplicates(['Process ID', 'Risk ID'], keep='last')
+
+            df_export = proc_df.merge(risk_df, how='cross').merge(
+                assess_df, on=['Process ID', 'Risk ID'], how='left', indicator=True
+            )
+            assessed = df_export['_merge'] == 'both'
+            for col in ('Vulnerability (%)', 'Resilience (%)'):
+                pct = (df_export.loc[assessed, col].astype(float) * 100).astype(int)
+                df_export[col] = pct.astype(object).reindex(df_export.index, fill_value='')
+            # The left merge turns downtime into float; write whole days back as ints
+            df_export['Downtime (days)'] = [
+                '' if not hit or pd.isna(d) else int(d) if float(d).is_integer() else d
+                for hit, d in zip(assessed, df_export['Downtime (days)'])
+            ]
+            df_export = df_export[[
+                'Process Name', 'Process ID', 'Risk Name', 'Risk ID', 'Criticality/Day',
+                'Probability (%)', 'Vulnerability (%)', 'Resilience (%)', 'Downtime (days)'
+            ]]
 
             # Create Excel file in memory
             output = io.BytesIO()
@@ -569,6 +677,7 @@ def import_export_assessments():
                                 error_count += 1
                                 st.warning(f"Row {idx + 2}: {str(e)}")
 
+                        _clear_cached_lookups()
                         st.success(f"✅ Imported {saved_count} assessments!")
                         if error_count > 0:
                             st.warning(f"⚠️ {error_count} rows had errors")
@@ -616,7 +725,7 @@ def main():
             st.switch_page("pages/3_Risk_Selection.py")
 
     with col3:
-        assessments = get_assessments(st.session_state.current_client_id)
+        assessments = _cached_get_assessments(st.session_state.current_client_id)
         if assessments:
             if st.button("Next: Results →", type="primary"):
                 st.switch_page("pages/5_Results_Dashboard.py")
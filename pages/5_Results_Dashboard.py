@@ -6,6 +6,7 @@ Visualize and export risk exposure analysis.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from io import BytesIO
@@ -23,20 +24,30 @@ from utils.helpers import (
 )
 from modules.database import (
     get_client, get_all_clients, get_client_processes, get_client_risks,
-    get_assessments, get_risk_exposure_summary, calculate_risk_exposure
+    get_assessments, get_risk_exposure_summary, calculate_risk_exposure,
+    get_data_version
 )
 
 st.set_page_config(page_title="Results Dashboard | PRISM Brain", page_icon="💰", layout="wide")
 
+# Domain colors for every chart on this page
+DOMAIN_COLOR_MAP = {d: get_domain_color(d) for d in RISK_DOMAINS.keys()}
+
 if 'current_client_id' not in st.session_state:
     st.session_state.current_client_id = None
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_all_clients():
+    """Cache the client list for the sidebar selector."""
+    return get_all_clients()
+
+
 def client_selector_sidebar():
     """Client selection sidebar."""
     st.sidebar.header("🏢 Current Client")
 
-    clients = get_all_clients()
+    clients = _cached_get_all_clients()
     if not clients:
         st.sidebar.warning("No clients created")
         return
@@ -129,10 +140,16 @@ def domain_breakdown_chart(summary, currency):
     if not summary['by_domain']:
         return None
 
+    return _build_domain_fig(tuple(summary['by_domain'].items()))
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_domain_fig(domain_items):
+    """Build the domain pie chart; cached on the (domain, exposure) pairs."""
     df = pd.DataFrame([
         {"Domain": domain, "Exposure": exposure,
          "Color": get_domain_color(domain)}
-        for domain, exposure in summary['by_domain'].items()
+        for domain, exposure in domain_items
     ])
 
     # Pie chart
@@ -140,7 +157,7 @@ def domain_breakdown_chart(summary, currency):
         df, values='Exposure', names='Domain',
         title='Risk Exposure by Domain',
         color='Domain',
-        color_discrete_map={d: get_domain_color(d) for d in RISK_DOMAINS.keys()},
+        color_discrete_map=DOMAIN_COLOR_MAP,
         hole=0.4
     )
 
@@ -155,21 +172,35 @@ def process_exposure_chart(summary, currency, top_n=10):
     if not summary['by_process']:
         return None
 
-    # Sort and take top N
-    sorted_procs = sorted(summary['by_process'].items(),
-                         key=lambda x: x[1], reverse=True)[:top_n]
+    return _build_process_fig(tuple(summary['by_process'].items()), top_n)
 
-    df = pd.DataFrame([
-        {"Process": name[:25], "Exposure": exposure}
-        for name, exposure in sorted_procs
-    ])
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_process_fig(process_items, top_n):
+    """Build the top-processes bar chart; cached on the (process, exposure) pairs."""
+    names = np.array([name[:25] for name, _ in process_items], dtype=object)
+    exposure = np.fromiter((e for _, e in process_items), dtype=np.float64,
+                           count=len(process_items))
+
+    # Sort descending once; the running share of total exposure is a cumsum
+    order = np.argsort(-exposure, kind='stable')
+    exposure_s = exposure[order]
+    total = exposure_s.sum()
+    cum_pct = np.cumsum(exposure_s) / total * 100 if total > 0 else np.zeros_like(exposure_s)
+
+    df = pd.DataFrame({
+        "Process": names[order][:top_n],
+        "Exposure": exposure_s[:top_n],
+        "Cumulative %": cum_pct[:top_n]
+    })
 
     fig = px.bar(
         df, x='Exposure', y='Process',
         orientation='h',
         title=f'Top {top_n} Processes by Risk Exposure',
         color='Exposure',
-        color_continuous_scale='Reds'
+        color_continuous_scale='Reds',
+        hover_data={'Cumulative %': ':.1f'}
     )
 
     fig.update_layout(
@@ -186,7 +217,13 @@ def risk_exposure_chart(summary, currency, top_n=10):
     if not summary['by_risk']:
         return None
 
-    sorted_risks = sorted(summary['by_risk'].items(),
+    return _build_risk_fig(tuple(summary['by_risk'].items()), top_n)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_risk_fig(risk_items, top_n):
+    """Build the top-risks bar chart; cached on the (risk, exposure) pairs."""
+    sorted_risks = sorted(risk_items,
                          key=lambda x: x[1], reverse=True)[:top_n]
 
     df = pd.DataFrame([
@@ -216,13 +253,18 @@ def heatmap_chart(summary, currency):
     if not summary['assessments']:
         return None
 
+    return _build_heatmap_fig(tuple(
+        (a['process_name'][:20], a['domain'], a['exposure'])
+        for a in summary['assessments']
+    ))
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_heatmap_fig(cells):
+    """Build the process x domain heatmap; cached on (process, domain, exposure) cells."""
     # Aggregate by process and domain
     heatmap_data = {}
-    for a in summary['assessments']:
-        process = a['process_name'][:20]
-        domain = a['domain']
-        exposure = a['exposure']
-
+    for process, domain, exposure in cells:
         if process not in heatmap_data:
             heatmap_data[process] = {}
         if domain not in heatmap_data[process]:
@@ -258,6 +300,24 @@ def heatmap_chart(summary, currency):
     return fig
 
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_domain_totals_fig(domain_items):
+    """Build the domain totals bar once per distinct set of domain totals."""
+    df_domains = pd.DataFrame([
+        {"Domain": d, "Exposure": e, "Icon": get_domain_icon(d)}
+        for d, e in domain_items
+    ])
+
+    fig = px.bar(
+        df_domains, x='Domain', y='Exposure',
+        title='Total Exposure by Domain',
+        color='Domain',
+        color_discrete_map=DOMAIN_COLOR_MAP
+    )
+    fig.update_layout(showlegend=False, height=350)
+    return fig
+
+
 def visualizations_tab():
     """Visualizations tab content."""
     st.subheader("📈 Risk Visualizations")
@@ -296,18 +356,7 @@ def visualizations_tab():
 
         # Domain totals bar
         if summary['by_domain']:
-            df_domains = pd.DataFrame([
-                {"Domain": d, "Exposure": e, "Icon": get_domain_icon(d)}
-                for d, e in summary['by_domain'].items()
-            ])
-
-            fig4 = px.bar(
-                df_domains, x='Domain', y='Exposure',
-                title='Total Exposure by Domain',
-                color='Domain',
-                color_discrete_map={d: get_domain_color(d) for d in RISK_DOMAINS.keys()}
-            )
-            fig4.update_layout(showlegend=False, height=350)
+            fig4 = _build_domain_totals_fig(tuple(sorted(summary['by_domain'].items())))
             st.plotly_chart(fig4, use_container_width=True)
 
     # Full heatmap
@@ -317,6 +366,46 @@ def visualizations_tab():
         st.plotly_chart(fig_heatmap, use_container_width=True)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _detailed_results_df(client_id, symbol, data_version):
+    """Detailed results table for a client, sorted by exposure (ascending).
+
+    Keyed on the database data version so saved or imported assessments show
+    up at once, matching the uncached summary used by the other tabs.
+    """
+    summary = get_risk_exposure_summary(client_id)
+    if not summary:
+        return None
+
+    data = []
+    for a in summary['assessments']:
+        data.append({
+            "Process": a['process_name'],
+            "Risk": a['risk_name'],
+            "Domain": a['domain'],
+            f"Criticality ({symbol}/day)": a['criticality_per_day'],
+            "Vulnerability (%)": a['vulnerability'] * 100,
+            "Resilience (%)": a['resilience'] * 100,
+            "Downtime (days)": a.get('expected_downtime'),
+            "Probability (%)": a['probability'] * 100,
+            f"Exposure ({symbol}/yr)": a['exposure']
+        })
+
+    # Narrow dtypes to shrink the Arrow payload sent to the browser; exposure
+    # stays float64 so currency totals keep full precision. Downtime is nullable
+    # (backend payloads may omit it), hence the nullable Int32.
+    df = pd.DataFrame(data)
+    df["Downtime (days)"] = pd.to_numeric(df["Downtime (days)"]).round().astype('Int32')
+    df = df.astype({
+        f"Criticality ({symbol}/day)": 'float32',
+        "Vulnerability (%)": 'float32',
+        "Resilience (%)": 'float32',
+        "Probability (%)": 'float32'
+    })
+    return df.sort_values(f"Exposure ({symbol}/yr)", kind='stable').reset_index(drop=True)
+
+
+@st.fragment
 def detailed_results_tab():
     """Detailed results table."""
     st.subheader("📋 Detailed Results")
@@ -325,15 +414,15 @@ def detailed_results_tab():
         return
 
     client = get_client(st.session_state.current_client_id)
-    summary = get_risk_exposure_summary(st.session_state.current_client_id)
+    currency = client.get('currency', 'EUR')
+    symbol = CURRENCY_SYMBOLS.get(currency, '€')
 
-    if not summary:
+    df = _detailed_results_df(st.session_state.current_client_id, symbol, get_data_version())
+
+    if df is None:
         st.warning("No results available.")
         return
 
-    currency = client.get('currency', 'EUR')
-    symbol = CURRENCY_SYMBOLS.get(currency, '€')
-
     # Filter options
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -355,29 +444,14 @@ def detailed_results_tab():
             step=1000
         )
 
-    # Prepare data
-    data = []
-    for a in summary['assessments']:
-        data.append({
-            "Process": a['process_name'],
-            "Risk": a['risk_name'],
-            "Domain": a['domain'],
-            f"Criticality ({symbol}/day)": a['criticality_per_day'],
-            "Vulnerability (%)": a['vulnerability'] * 100,
-            "Resilience (%)": a['resilience'] * 100,
-            "Downtime (days)": a['expected_downtime'],
-            "Probability (%)": a['probability'] * 100,
-            f"Exposure ({symbol}/yr)": a['exposure']
-        })
-
-    df = pd.DataFrame(data)
+    # Apply filters: rows are pre-sorted by exposure, so the minimum is a binary search
+    exposure_col = f"Exposure ({symbol}/yr)"
+    cutoff = np.searchsorted(df[exposure_col].values, min_exposure, side='left')
+    df = df.iloc[cutoff:]
 
-    # Apply filters
     if domain_filter != "All":
         df = df[df['Domain'] == domain_filter]
 
-    df = df[df[f"Exposure ({symbol}/yr)"] >= min_exposure]
-
     # Sort
     if sort_by == "Exposure (High to Low)":
         df = df.sort_values(f"Exposure ({symbol}/yr)", ascending=False)
@@ -7,6 +7,7 @@ Now with real API connections and configurable refresh schedules.
 import streamlit as st
 import pandas as pd
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -30,7 +31,7 @@ from modules.external_data import (
 )
 from modules.probability_engine import (
     calculate_all_probabilities,
-    get_probability_summary,
+    summarize_probabilities,
     FACTOR_WEIGHTS
 )
 from modules.database import get_client, get_all_clients, is_backend_online
@@ -42,6 +43,39 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_data(show_spinner=False)
+def _factor_weights_html():
+    """Render the static factor weights as one HTML block, built once per process."""
+    return "".join(
+        f'<div>{k.replace("_", " ").title()}: {w:.1%}<br>'
+        f'<progress value="{w}" max="1" style="width: 100%"></progress></div>'
+        for k, w in FACTOR_WEIGHTS.items()
+    )
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_freshness():
+    """Cache the data freshness summary across reruns."""
+    return get_data_freshness()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_schedule():
+    """Cache the refresh schedule across reruns."""
+    return get_refresh_schedule()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_data_sources():
+    """Cache the configured data sources across reruns."""
+    return get_data_sources()
+
+
+def _clear_status_caches():
+    """Drop cached status reads after a refresh changes them."""
+    _cached_freshness.clear()
+    _cached_schedule.clear()
+
 
 def show_refresh_trigger():
     """
@@ -125,6 +159,7 @@ def show_refresh_trigger():
 
             # Success message with results
             progress_placeholder.empty()
+            _clear_status_caches()
 
             success_cols = st.columns([0.6, 0.4])
             with success_cols[0]:
@@ -192,12 +227,10 @@ def show_refresh_trigger():
     st.divider()
 
 
-def show_api_status():
+def show_api_status(backend_online):
     """Display API status and configuration dashboard."""
     st.subheader("📊 API Status & Configuration")
 
-    # Get backend status
-    backend_online = is_backend_online()
     status_col, refresh_col = st.columns([3, 1])
 
     with status_col:
@@ -243,7 +276,7 @@ def show_api_status():
 
         with config_tabs[0]:
             st.write("**Configured Data Sources:**")
-            sources = get_data_sources()
+            sources = _cached_data_sources()
             if sources:
                 sources_df = pd.DataFrame(sources)
                 st.dataframe(sources_df, use_container_width=True, hide_index=True)
@@ -251,18 +284,11 @@ def show_api_status():
                 st.info("No data sources configured")
 
         with config_tabs[1]:
-            st.write("**API Keys:**")
-            col1, col2 = st.columns([2, 1])
-            with col1:
-                key_name = st.text_input("API Provider Name", key="key_name_input")
-            with col2:
-                st.write("") # spacing
-                if st.button("Add API Key", key="add_api_key_btn"):
-                    st.info("API key configuration form would appear here")
+            show_api_keys_form()
 
         with config_tabs[2]:
             st.write("**Refresh Schedule:**")
-            schedule = get_refresh_schedule()
+            schedule = _cached_schedule()
             col1, col2 = st.columns(2)
             with col1:
                 interval = st.number_input(
@@ -278,12 +304,51 @@ def show_api_status():
                     st.success("Schedule updated")
 
 
-def show_data_freshness():
+@st.fragment
+def show_api_keys_form():
+    """API key entry; a fragment so saving keys reruns only this section."""
+    st.write("**API Keys:**")
+    # Filled in after the form is handled so a key saved on this run shows immediately
+    status_area = st.container()
+
+    # One form for both providers; keys entered together are validated concurrently
+    with st.form("api_keys_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            owm_key = st.text_input("OpenWeatherMap API Key", type="password", key="owm_key_input")
+        with col2:
+            news_key = st.text_input("NewsAPI Key", type="password", key="newsapi_key_input")
+        submitted = st.form_submit_button("Save & Validate")
+
+    if submitted:
+        pending = [(service, key.strip()) for service, key in
+                   (("openweathermap", owm_key), ("newsapi", news_key)) if key.strip()]
+        if not pending:
+            st.warning("Enter at least one API key")
+        else:
+            with st.spinner("Validating API keys..."):
+                with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                    results = list(executor.map(lambda p: validate_api_key(*p), pending))
+            for result in results:
+                if result['valid']:
+                    st.success(f"✅ {result['service']}: {result['message']}")
+                else:
+                    st.error(f"❌ {result['service']}: {result['message']}")
+
+    api_status = get_api_status()
+    with status_area:
+        for service, label in (("openweathermap", "OpenWeatherMap"), ("newsapi", "NewsAPI")):
+            status = api_status[service]
+            if status['configured']:
+                st.caption(f"{label}: configured ({status['source']})")
+            else:
+                st.caption(f"{label}: not configured")
+
+
+def show_data_freshness(freshness):
     """Display data freshness and last update information."""
     st.subheader("📅 Data Freshness")
 
-    freshness = get_data_freshness()
-
     col1, col2, col3 = st.columns(3, gap="medium")
 
     with col1:
@@ -322,15 +387,9 @@ def show_probability_summary():
     """Display summary of current probability calculations."""
     st.subheader("📈 Probability Summary")
 
-    # Build probabilities dict from session state if available
+    # Summarize the session's probabilities straight from the values, no per-risk dicts
     calc_probs = st.session_state.get('calculated_probabilities', {})
-    if calc_probs:
-        probs_dict = {
-            'probabilities': {k: {'probability': v} for k, v in calc_probs.items()}
-        }
-        summary = get_probability_summary(probs_dict)
-    else:
-        summary = {}
+    summary = summarize_probabilities(calc_probs.values()) if calc_probs else {}
 
     col1, col2, col3 = st.columns(3, gap="medium")
 
@@ -372,10 +431,8 @@ def show_factor_weights():
 
     st.write("**Current weights used in probability calculations:**")
 
-    weights_df = pd.DataFrame(list(FACTOR_WEIGHTS.items()), columns=["Factor", "Weight"])
-    weights_df["Weight"] = weights_df["Weight"].apply(lambda x: f"{x:.1%}")
-
-    st.dataframe(weights_df, use_container_width=True, hide_index=True)
+    # One markdown element with native <progress> bars instead of a dataframe component
+    st.markdown(_factor_weights_html(), unsafe_allow_html=True)
 
     st.caption(
         "These weights determine the relative importance of each data source "
@@ -393,26 +450,33 @@ def main():
     )
 
     # Show API status dashboard
-    show_api_status()
+    show_api_status(is_backend_online())
 
     # Show prominent refresh trigger section
     show_refresh_trigger()
 
+    # Read freshness once, after any refresh above, and share it with both views
+    freshness = _cached_freshness()
+
     # Show data freshness information
-    show_data_freshness()
+    show_data_freshness(freshness)
 
     st.divider()
 
-    # Create tabs for different views
-    tab1, tab2, tab3 = st.tabs(["Probability Summary", "Data Sources", "Factor Weights"])
+    # Tab-style view switcher; unlike st.tabs only the selected view runs on a rerun
+    view = st.radio(
+        "View",
+        ["Probability Summary", "Data Sources", "Factor Weights"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="ds_tab"
+    )
 
-    with tab1:
+    if view == "Probability Summary":
         show_probability_summary()
-
-    with tab2:
-        show_data_freshness()
-
-    with tab3:
+    elif view == "Data Sources":
+        show_data_freshness(freshness)
+    else:
         show_factor_weights()
 
     st.divider()
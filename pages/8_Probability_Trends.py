@@ -1,6 +1,5 @@
 import streamlit as st
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 import sys
 import os
@@ -254,11 +253,11 @@ if is_connected:
                                 fillcolor="rgba(0,100,200,0.1)"
                             ))
                         
-                        # Add main probability line
-                        fig.add_trace(go.Scatter(
+                        # Add main probability line (WebGL; markers only while they stay readable)
+                        fig.add_trace(go.Scattergl(
                             x=df_trend["snapshot_date"],
                             y=df_trend["probability_pct"],
-                            mode="lines+markers",
+                            mode="lines+markers" if len(df_trend) <= 25 else "lines",
                             name="Probability",
                             line=dict(color="#FF6B6B", width=3),
                             marker=dict(size=6)
@@ -269,7 +268,7 @@ if is_connected:
                             z = np.polyfit(range(len(df_trend)), df_trend["probability_pct"].values, 1)
                             p = np.poly1d(z)
                             trend_line = p(range(len(df_trend)))
-                            fig.add_trace(go.Scatter(
+                            fig.add_trace(go.Scattergl(
                                 x=df_trend["snapshot_date"],
                                 y=trend_line,
                                 mode="lines",
@@ -283,7 +282,8 @@ if is_connected:
                             yaxis_title="Probability (%)",
                             hovermode="x unified",
                             height=450,
-                            template="plotly_white"
+                            template="plotly_white",
+                            uirevision=selected_event_id
                         )
                         
                         st.plotly_chart(fig, use_container_width=True)
@@ -323,14 +323,18 @@ with tab3:
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            st.write(f"**Alert Name:** {alert.get('alert_name', 'N/A')}")
-                            st.write(f"**Event ID:** {alert.get('event_id', 'N/A')}")
-                            st.write(f"**Triggered Value:** {alert.get('triggered_value', 'N/A')}%")
+                            st.markdown(
+                                f"**Alert Name:** {alert.get('alert_name', 'N/A')}\n\n"
+                                f"**Event ID:** {alert.get('event_id', 'N/A')}\n\n"
+                                f"**Triggered Value:** {alert.get('triggered_value', 'N/A')}%"
+                            )
                         
                         with col2:
-                            st.write(f"**Timestamp:** {alert.get('timestamp', 'N/A')}")
-                            st.write(f"**Direction:** {alert.get('direction', 'N/A')}")
-                            st.write(f"**Threshold:** {alert.get('threshold', 'N/A')}%")
+                            st.markdown(
+                                f"**Timestamp:** {alert.get('timestamp', 'N/A')}\n\n"
+                                f"**Direction:** {alert.get('direction', 'N/A')}\n\n"
+                                f"**Threshold:** {alert.get('threshold', 'N/A')}%"
+                            )
     
     except Exception as e:
         st.error(f"Error loading alert history: {str(e)}")
@@ -5,78 +5,205 @@ Common functions used across the application.
 """
 
 import json
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
-from datetime import datetime
+from types import MappingProxyType
+
+import numpy as np
+
+# orjson parses the data files noticeably faster; it is optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from utils.constants import CURRENCY_SYMBOLS, RISK_DOMAINS, RISK_LEVELS
 
 # Data directory
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Lookup tables for the formatters, derived once from utils.constants
+_DOMAIN_COLORS = {domain: info["color"] for domain, info in RISK_DOMAINS.items()}
+_DOMAIN_ICONS = {domain: info["icon"] for domain, info in RISK_DOMAINS.items()}
+_RISK_LEVEL_COLORS = {level: info["color"] for level, info in RISK_LEVELS.items()}
 
-def load_risk_database():
-    """Load the full risk database from JSON."""
-    with open(DATA_DIR / "risk_database.json", 'r') as f:
+# Risk levels in ascending order of their minimum probability, for bisect in get_risk_level
+_RISK_LEVEL_NAMES = sorted(RISK_LEVELS, key=lambda level: RISK_LEVELS[level]["min"])
+_RISK_LEVEL_THRESHOLDS = [RISK_LEVELS[level]["min"] for level in _RISK_LEVEL_NAMES[1:]]
+
+
+# Categorical risk fields: a few dozen distinct values repeated across every record
+_RISK_CATEGORY_FIELDS = (
+    'Layer_1_Primary', 'Layer_1_Secondary', 'Layer_2_Primary', 'Layer_2_Secondary',
+    'Super_Risk', 'Super_Risk_Rationale', 'Geographic_Scope', 'Time_Horizon',
+    'Source_Category',
+)
+
+
+_EMPTY_MAPPING = MappingProxyType({})
+
+
+def _parse_json(path):
+    """Parse a JSON data file, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
         return json.load(f)
 
 
+def _freeze(value):
+    """Read-only copy of parsed JSON: dicts become MappingProxyType views, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=16)
+def _load_json(path, mtime):
+    """
+    Parse a JSON data file; cached per (path, mtime) so edits on disk are picked up.
+    The result is frozen so every caller can share it; use dict()/list() to get a mutable copy.
+    """
+    return _freeze(_parse_json(path))
+
+
+@lru_cache(maxsize=2)
+def _load_risk_records(path, mtime):
+    """
+    Parse the risk database, sharing one string object per repeated categorical value.
+    Returns a tuple of read-only records (MappingProxyType), like _load_json.
+    """
+    risks = _parse_json(path)
+    shared = {}
+    for risk in risks:
+        for field in _RISK_CATEGORY_FIELDS:
+            value = risk.get(field)
+            if isinstance(value, str):
+                risk[field] = shared.setdefault(value, value)
+    return tuple(MappingProxyType(risk) for risk in risks)
+
+
+def _data_file(name):
+    """Return (path, mtime) for a file in the data directory, the cache key for its loaders."""
+    path = DATA_DIR / name
+    return path, path.stat().st_mtime
+
+
+def load_risk_database():
+    """Load the full risk database from JSON (parsed once per file version)."""
+    return _load_risk_records(*_data_file("risk_database.json"))
+
+
 def load_process_framework():
-    """Load the APQC process framework from JSON."""
-    with open(DATA_DIR / "process_framework.json", 'r') as f:
-        return json.load(f)
+    """Load the APQC process framework from JSON (parsed once per file version)."""
+    return _load_json(*_data_file("process_framework.json"))
 
 
 def load_data_summary():
-    """Load the data summary."""
-    with open(DATA_DIR / "data_summary.json", 'r') as f:
-        return json.load(f)
+    """Load the data summary (parsed once per file version)."""
+    return _load_json(*_data_file("data_summary.json"))
+
+
+@lru_cache(maxsize=1)
+def _risks_by_id(mtime):
+    """Index the risk database by Event_ID (first occurrence wins), rebuilt when the file changes."""
+    index = {}
+    for risk in load_risk_database():
+        index.setdefault(risk.get('Event_ID'), risk)
+    return index
 
 
 def get_risk_by_id(risk_id):
     """Get a specific risk by its ID."""
-    risks = load_risk_database()
-    for risk in risks:
-        if risk.get('Event_ID') == risk_id:
-            return risk
-    return None
+    _, mtime = _data_file("risk_database.json")
+    return _risks_by_id(mtime).get(risk_id)
+
+
+@lru_cache(maxsize=1)
+def _risks_by_domain(mtime):
+    """Group the risk database by Layer_1_Primary, rebuilt when the file changes."""
+    index = {}
+    for risk in load_risk_database():
+        index.setdefault(risk.get('Layer_1_Primary'), []).append(risk)
+    return {domain: tuple(risks) for domain, risks in index.items()}
 
 
 def get_risks_by_domain(domain):
-    """Get all risks for a specific domain."""
-    risks = load_risk_database()
-    return [r for r in risks if r.get('Layer_1_Primary') == domain]
+    """Get all risks for a specific domain (a read-only tuple)."""
+    _, mtime = _data_file("risk_database.json")
+    return _risks_by_domain(mtime).get(domain, ())
+
+
+@lru_cache(maxsize=1)
+def _risks_by_domain_index(mtime):
+    """Case-insensitive view of _risks_by_domain (keys upper-cased)."""
+    index = {}
+    for domain, risks in _risks_by_domain(mtime).items():
+        index.setdefault((domain or '').upper(), []).extend(risks)
+    return {domain: tuple(risks) for domain, risks in index.items()}
+
+
+def load_risks_for_domain(domain, limit=10):
+    """Get up to `limit` risks for a domain (all of them if limit is None) without rescanning the database."""
+    _, mtime = _data_file("risk_database.json")
+    risks = _risks_by_domain_index(mtime).get((domain or '').upper(), ())
+    return risks[:limit] if limit is not None else risks
+
+
+@lru_cache(maxsize=1)
+def _super_risks(mtime):
+    """Super risks from the risk database, rebuilt when the file changes."""
+    return tuple(r for r in load_risk_database() if r.get('Super_Risk') == 'YES')
 
 
 def get_super_risks():
-    """Get all super risks."""
-    risks = load_risk_database()
-    return [r for r in risks if r.get('Super_Risk') == 'YES']
+    """Get all super risks (a read-only tuple)."""
+    _, mtime = _data_file("risk_database.json")
+    return _super_risks(mtime)
+
+
+@lru_cache(maxsize=1)
+def _processes_by_depth(mtime):
+    """Group the process framework by depth, rebuilt when the framework file changes."""
+    index = {}
+    for key, value in load_process_framework().items():
+        index.setdefault(value.get('depth'), {})[key] = value
+    return {depth: MappingProxyType(processes) for depth, processes in index.items()}
 
 
 def get_processes_by_level(level):
-    """Get all processes at a specific hierarchy level."""
-    processes = load_process_framework()
-    return {k: v for k, v in processes.items() if v.get('depth') == level}
+    """Get all processes at a specific hierarchy level (a read-only mapping)."""
+    _, mtime = _data_file("process_framework.json")
+    return _processes_by_depth(mtime).get(level, _EMPTY_MAPPING)
 
 
-def get_process_children(parent_id):
-    """Get child processes of a parent process."""
-    processes = load_process_framework()
-    children = {}
-    parent_prefix = f"{parent_id}."
+@lru_cache(maxsize=1)
+def _process_children_index(mtime):
+    """Map each process ID to its direct children, rebuilt when the framework file changes."""
+    index = {}
+    for key, value in load_process_framework().items():
+        if '.' in key:
+            # The parent of "1.2.3" is "1.2": only direct children (one level deeper)
+            index.setdefault(key.rsplit('.', 1)[0], {})[key] = value
+    return {parent: MappingProxyType(children) for parent, children in index.items()}
 
-    for key, value in processes.items():
-        if key.startswith(parent_prefix):
-            # Only direct children (one level deeper)
-            remaining = key[len(parent_prefix):]
-            if '.' not in remaining:
-                children[key] = value
 
-    return children
+def get_process_children(parent_id):
+    """Get child processes of a parent process (a read-only mapping)."""
+    _, mtime = _data_file("process_framework.json")
+    return _process_children_index(mtime).get(f"{parent_id}", _EMPTY_MAPPING)
 
 
 def format_currency(amount, currency="EUR"):
     """Format a number as currency."""
-    symbols = {"EUR": "€", "USD": "$", "GBP": "£", "NOK": "kr"}
-    symbol = symbols.get(currency, currency)
+    symbol = CURRENCY_SYMBOLS.get(currency, currency)
 
     if amount >= 1_000_000:
         return f"{symbol}{amount/1_000_000:.1f}M"
@@ -93,115 +220,162 @@ def format_percentage(value, decimals=1):
 
 def get_risk_level(probability):
     """Get risk level based on probability."""
-    if probability >= 0.65:
-        return "HIGH"
-    elif probability >= 0.40:
-        return "MEDIUM"
-    else:
+    if probability != probability:  # NaN sorts past every threshold in bisect
         return "LOW"
+    return _RISK_LEVEL_NAMES[bisect_right(_RISK_LEVEL_THRESHOLDS, probability)]
 
 
 def get_risk_level_color(level):
     """Get color for risk level."""
-    colors = {
-        "HIGH": "#FF6B6B",
-        "MEDIUM": "#FFE066",
-        "LOW": "#69DB7C"
-    }
-    return colors.get(level, "#CCCCCC")
+    return _RISK_LEVEL_COLORS.get(level, "#CCCCCC")
 
 
 def get_domain_color(domain):
     """Get color for a risk domain."""
-    colors = {
-        "PHYSICAL": "#FFC000",
-        "STRUCTURAL": "#5B9BD5",
-        "OPERATIONAL": "#70AD47",
-        "DIGITAL": "#7030A0"
-    }
-    return colors.get(domain, "#CCCCCC")
+    return _DOMAIN_COLORS.get(domain, "#CCCCCC")
 
 
 def get_domain_icon(domain):
     """Get icon for a risk domain."""
-    icons = {
-        "PHYSICAL": "🌍",
-        "STRUCTURAL": "🏛️",
-        "OPERATIONAL": "⚙️",
-        "DIGITAL": "💻"
-    }
-    return icons.get(domain, "📊")
+    return _DOMAIN_ICONS.get(domain, "📊")
 
 
 def calculate_default_criticality(revenue, num_processes):
     """
     Calculate default criticality per day for processes.
     Based on: Revenue / 250 working days / number of processes
+    Also accepts arrays (e.g. one entry per client) and returns an array,
+    with 0 wherever revenue or the process count is not positive.
     """
-    if revenue <= 0 or num_processes <= 0:
-        return 0
+    if np.ndim(revenue) == 0 and np.ndim(num_processes) == 0:
+        if revenue <= 0 or num_processes <= 0:
+            return 0
+        daily_revenue = revenue / 250  # Working days per year
+        return daily_revenue / num_processes
+
+    revenue = np.asarray(revenue, dtype=np.float64)
+    num_processes = np.asarray(num_processes, dtype=np.float64)
+    valid = (revenue > 0) & (num_processes > 0)
+    daily_revenue = revenue / 250
+    return np.divide(daily_revenue, num_processes, out=np.zeros(valid.shape), where=valid)
+
+
+# Event-name keywords that make a risk more relevant to export-heavy clients, with their bonus
+_EXPORT_KEYWORD_BONUS = (('shipping', 3), ('trade', 2))
+
+
+def _relevance_columns(risks):
+    """Column arrays used by filter_risks_by_relevance (text fields lower-cased)."""
+    names = np.array([r.get('Event_Name', '').lower() for r in risks])
+    export_bonus = np.zeros(len(risks))
+    for keyword, bonus in _EXPORT_KEYWORD_BONUS:
+        export_bonus += _contains(names, keyword) * bonus
+    affected = np.array([r.get('Affected_Industries', '').lower() for r in risks])
+    # Many risks share the same industry list: client terms are matched against
+    # each distinct list once and mapped back to the risks through integer codes
+    industries, industry_codes = np.unique(affected, return_inverse=True)
+    geo_scope = np.array([r.get('Geographic_Scope', '').lower() for r in risks])
+    return {
+        'base_probability': np.fromiter((r.get('base_probability', 0.5) for r in risks),
+                                        dtype=np.float64, count=len(risks)),
+        'industries': industries,
+        'industry_codes': industry_codes.astype(np.int32),
+        # Fixed patterns do not depend on the client, so they are matched here once
+        'all_industries': _contains(affected, 'all industries'),
+        'geo_global': _contains(geo_scope, 'global'),
+        'geo_europe': _contains(geo_scope, 'europe'),
+        'export_bonus': export_bonus,
+        'super_risk': np.fromiter((r.get('Super_Risk') == 'YES' for r in risks),
+                                  dtype=bool, count=len(risks)),
+    }
+
+
+@lru_cache(maxsize=1)
+def _database_relevance_columns(mtime):
+    """Relevance columns for the full risk database, lower-cased once per file version."""
+    return _relevance_columns(load_risk_database())
 
-    daily_revenue = revenue / 250  # Working days per year
-    return daily_revenue / num_processes
 
+def _contains(column, term):
+    """Vectorized `term in value` over a string array."""
+    return np.char.find(column, term) >= 0
 
-def filter_risks_by_relevance(risks, client_info):
+
+def rank_risks_by_relevance(risks, client_info, top_k=None):
     """
-    Filter and score risks based on relevance to client.
-    Returns risks sorted by relevance score.
+    Score risks for a client without copying them.
+    Returns (risk, score) pairs, best first, only the best top_k if given.
     """
+    if not risks or (top_k is not None and top_k <= 0):
+        return []
+
     # Extract client attributes
     industry = client_info.get('industry', '').lower()
     sectors = client_info.get('sectors', '').lower()
     location = client_info.get('location', '').lower()
     export_pct = client_info.get('export_percentage', 0)
 
-    scored_risks = []
+    # Tokenize the client profile once
+    sector_tokens = tuple(s.strip() for s in sectors.split(',')) if sectors else ()
+    location_is_europe = 'europe' in location
 
-    for risk in risks:
-        score = 0
-
-        # Base score from baseline probability
-        score += risk.get('base_probability', 0.5) * 10
-
-        # Industry match
-        affected = risk.get('Affected_Industries', '').lower()
-        if industry and industry in affected:
-            score += 5
-        if 'all industries' in affected:
-            score += 3
-
-        # Sector keywords match
-        if sectors:
-            for sector in sectors.split(','):
-                if sector.strip() in affected:
-                    score += 2
-
-        # Geographic match
-        geo_scope = risk.get('Geographic_Scope', '').lower()
-        if 'global' in geo_scope:
-            score += 2
-        if 'europe' in location.lower() and 'europe' in geo_scope:
-            score += 3
-
-        # Export dependency relevance
-        if export_pct > 50:
-            if 'shipping' in risk.get('Event_Name', '').lower():
-                score += 3
-            if 'trade' in risk.get('Event_Name', '').lower():
-                score += 2
-
-        # Super risk bonus
-        if risk.get('Super_Risk') == 'YES':
-            score += 5
-
-        scored_risks.append({
-            **risk,
-            'relevance_score': score
-        })
-
-    # Sort by relevance score
-    return sorted(scored_risks, key=lambda x: x['relevance_score'], reverse=True)
+    # Score every risk at once: each rule is a boolean mask times its weight.
+    # The full database (the common case) reuses columns prepared at load time.
+    path, mtime = _data_file("risk_database.json")
+    if risks is _load_risk_records(path, mtime):
+        cols = _database_relevance_columns(mtime)
+    else:
+        cols = _relevance_columns(risks)
+    industries = cols['industries']
+    industry_codes = cols['industry_codes']
+
+    # Base score from baseline probability
+    score = cols['base_probability'] * 10
+
+    # Industry match
+    if industry:
+        score += _contains(industries, industry)[industry_codes] * 5
+    score += cols['all_industries'] * 3
+
+    # Sector keywords match
+    for sector in sector_tokens:
+        score += _contains(industries, sector)[industry_codes] * 2
+
+    # Geographic match
+    score += cols['geo_global'] * 2
+    if location_is_europe:
+        score += cols['geo_europe'] * 3
+
+    # Export dependency relevance
+    if export_pct > 50:
+        score += cols['export_bonus']
+
+    # Super risk bonus
+    score += cols['super_risk'] * 5
+
+    # Sort by relevance score (stable, so ties keep their input order as before)
+    neg = -score
+    if top_k is not None and top_k < len(neg):
+        # Partition out the top_k threshold and only sort candidates at or above it
+        threshold = np.partition(neg, top_k - 1)[top_k - 1]
+        candidates = np.flatnonzero(neg <= threshold)
+        order = candidates[np.argsort(neg[candidates], kind='stable')][:top_k]
+    else:
+        order = np.argsort(neg, kind='stable')
+    scores = score.tolist()
+    return [(risks[i], scores[i]) for i in order.tolist()]
+
+
+def filter_risks_by_relevance(risks, client_info, top_k=None):
+    """
+    Filter and score risks based on relevance to client.
+    Returns risks sorted by relevance score, only the best top_k if given.
+    Use rank_risks_by_relevance to get the scores without copying each risk.
+    """
+    return [
+        {**risk, 'relevance_score': score}
+        for risk, score in rank_risks_by_relevance(risks, client_info, top_k)
+    ]
 
 
 def generate_assessment_combinations(processes, risks):
@@ -209,13 +383,9 @@ def generate_assessment_combinations(processes, risks):
     Generate all process-risk combinations that need assessment.
     Returns list of tuples: (process, risk)
     """
-    combinations = []
-    for process in processes:
-        for risk in risks:
-            combinations.append((process, risk))
-    return combinations
+    return list(product(processes, risks))
 
 
 def export_timestamp():
     """Generate timestamp for export filenames."""
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
+    return time.strftime("%Y%m%d_%H%M%S")